@@ -1,13 +1,28 @@
 """AST classes and functions."""
 
-from enum import Enum
-from typing import List, Tuple
+import sys
+
+from typing import (
+    ClassVar,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
 
 from arx.lexer import SourceLocation
 
 
-class ExprKind(Enum):
-    """The expression kind class used for downcasting."""
+class ExprKind:
+    """
+    The expression kind class used for downcasting.
+
+    The kinds are plain `int` constants (instead of `Enum` members), so
+    reading and comparing them doesn't go through the enum machinery.
+    """
 
     GenericKind = -1
     ModuleKind = -2
@@ -56,20 +71,42 @@ class ExprKind(Enum):
 
 
 class ExprAST:
-    """AST main expression class."""
+    """
+    AST main expression class.
+
+    The source location is stored as two plain `int` fields (`line` and
+    `col`), instead of a reference to a `SourceLocation` object per node.
+    """
+
+    __slots__ = ("col", "line")
 
-    loc: SourceLocation
-    kind: ExprKind
+    line: int
+    col: int
+    kind: ClassVar[int] = ExprKind.GenericKind
+    # name of the visitor method for this node class (see `arx.codegen`)
+    visit_method_name: ClassVar[str] = ""
 
-    def __init__(self, loc: SourceLocation = SourceLocation(0, 0)) -> None:
+    def __init__(self, loc: Optional[SourceLocation] = None) -> None:
         """Initialize the ExprAST instance."""
-        self.kind = ExprKind.GenericKind
-        self.loc = loc
+        if loc is None:
+            self.line = 0
+            self.col = 0
+        else:
+            self.line = loc.line
+            self.col = loc.col
+
+    @property
+    def loc(self) -> SourceLocation:
+        """Return the source location of the node."""
+        return SourceLocation(self.line, self.col)
 
 
 class BlockAST(ExprAST):
     """The AST tree."""
 
+    __slots__ = ("nodes",)
+    visit_method_name: ClassVar[str] = "visit_block"
+
     nodes: List[ExprAST]
 
     def __init__(self) -> None:
@@ -81,36 +118,48 @@ class BlockAST(ExprAST):
 class ModuleAST(BlockAST):
     """AST main expression class."""
 
+    __slots__ = ("name",)
+    kind: ClassVar[int] = ExprKind.ModuleKind
+    visit_method_name: ClassVar[str] = "visit_module"
+
     name: str
 
     def __init__(self, name: str) -> None:
         """Initialize the ExprAST instance."""
         super().__init__()
         self.name = name
-        self.kind = ExprKind.ModuleKind
 
 
 class FloatExprAST(ExprAST):
     """AST for the literal float number."""
 
+    __slots__ = ("value",)
+    kind: ClassVar[int] = ExprKind.FloatDTKind
+    visit_method_name: ClassVar[str] = "visit_float_expr"
+
     value: float
 
     def __init__(self, val: float) -> None:
         """Initialize the FloatAST instance."""
         super().__init__()
         self.value = val
-        self.kind = ExprKind.FloatDTKind
 
 
 class VariableExprAST(ExprAST):
     """AST class for the variable usage."""
 
+    __slots__ = ("name", "type_name")
+    kind: ClassVar[int] = ExprKind.VariableKind
+    visit_method_name: ClassVar[str] = "visit_variable_expr"
+
+    name: str
+    type_name: str
+
     def __init__(self, loc: SourceLocation, name: str, type_name: str) -> None:
         """Initialize the VariableExprAST instance."""
         super().__init__(loc)
         self.name = name
-        self.type_name = type_name
-        self.kind = ExprKind.VariableKind
+        self.type_name = sys.intern(type_name)
 
     def get_name(self) -> str:
         """Return the variable name."""
@@ -120,17 +169,31 @@ class VariableExprAST(ExprAST):
 class UnaryExprAST(ExprAST):
     """AST class for the unary operator."""
 
+    __slots__ = ("op_code", "operand")
+    kind: ClassVar[int] = ExprKind.UnaryOpKind
+    visit_method_name: ClassVar[str] = "visit_unary_expr"
+
+    op_code: str
+    operand: ExprAST
+
     def __init__(self, op_code: str, operand: ExprAST) -> None:
         """Initialize the UnaryExprAST instance."""
         super().__init__()
         self.op_code = op_code
         self.operand = operand
-        self.kind = ExprKind.UnaryOpKind
 
 
 class BinaryExprAST(ExprAST):
     """AST class for the binary operator."""
 
+    __slots__ = ("lhs", "op", "rhs")
+    kind: ClassVar[int] = ExprKind.BinaryOpKind
+    visit_method_name: ClassVar[str] = "visit_binary_expr"
+
+    op: str
+    lhs: ExprAST
+    rhs: ExprAST
+
     def __init__(
         self, loc: SourceLocation, op: str, lhs: ExprAST, rhs: ExprAST
     ) -> None:
@@ -139,25 +202,34 @@ class BinaryExprAST(ExprAST):
         self.op = op
         self.lhs = lhs
         self.rhs = rhs
-        self.kind = ExprKind.BinaryOpKind
 
 
 class CallExprAST(ExprAST):
     """AST class for function call."""
 
+    __slots__ = ("args", "callee")
+    kind: ClassVar[int] = ExprKind.CallKind
+    visit_method_name: ClassVar[str] = "visit_call_expr"
+
+    callee: str
+    args: Tuple[ExprAST, ...]
+
     def __init__(
-        self, loc: SourceLocation, callee: str, args: List[ExprAST]
+        self, loc: SourceLocation, callee: str, args: Sequence[ExprAST]
     ) -> None:
         """Initialize the CallExprAST instance."""
         super().__init__(loc)
         self.callee = callee
-        self.args = args
-        self.kind = ExprKind.CallKind
+        self.args = tuple(args)
 
 
 class IfStmtAST(ExprAST):
     """AST class for `if` statement."""
 
+    __slots__ = ("cond", "else_", "then_")
+    kind: ClassVar[int] = ExprKind.IfKind
+    visit_method_name: ClassVar[str] = "visit_if_stmt"
+
     cond: ExprAST
     then_: BlockAST
     else_: BlockAST
@@ -174,12 +246,15 @@ class IfStmtAST(ExprAST):
         self.cond = cond
         self.then_ = then_
         self.else_ = else_
-        self.kind = ExprKind.IfKind
 
 
 class ForStmtAST(ExprAST):
     """AST class for `For` statement."""
 
+    __slots__ = ("body", "end", "start", "step", "var_name")
+    kind: ClassVar[int] = ExprKind.ForKind
+    visit_method_name: ClassVar[str] = "visit_for_stmt"
+
     var_name: str
     start: ExprAST
     end: ExprAST
@@ -201,35 +276,41 @@ class ForStmtAST(ExprAST):
         self.end = end
         self.step = step
         self.body = body
-        self.kind = ExprKind.ForKind
 
 
 class VarExprAST(ExprAST):
     """AST class for variable declaration."""
 
-    var_names: List[Tuple[str, ExprAST]]
+    __slots__ = ("body", "type_name", "var_names")
+    kind: ClassVar[int] = ExprKind.VarKind
+    visit_method_name: ClassVar[str] = "visit_var_expr"
+
+    var_names: Tuple[Tuple[str, ExprAST], ...]
     type_name: str
     body: ExprAST
 
     def __init__(
         self,
-        var_names: List[Tuple[str, ExprAST]],
+        var_names: Sequence[Tuple[str, ExprAST]],
         type_name: str,
         body: ExprAST,
     ) -> None:
         """Initialize the VarExprAST instance."""
         super().__init__()
-        self.var_names = var_names
-        self.type_name = type_name
+        self.var_names = tuple(var_names)
+        self.type_name = sys.intern(type_name)
         self.body = body
-        self.kind = ExprKind.VarKind
 
 
 class PrototypeAST(ExprAST):
     """AST class for function prototype declaration."""
 
+    __slots__ = ("args", "name", "type_name")
+    kind: ClassVar[int] = ExprKind.PrototypeKind
+    visit_method_name: ClassVar[str] = "visit_prototype"
+
     name: str
-    args: List[VariableExprAST]
+    args: Tuple[VariableExprAST, ...]
     type_name: str
 
     def __init__(
@@ -237,15 +318,13 @@ class PrototypeAST(ExprAST):
         loc: SourceLocation,
         name: str,
         type_name: str,
-        args: List[VariableExprAST],
+        args: Sequence[VariableExprAST],
     ) -> None:
         """Initialize the PrototypeAST instance."""
-        super().__init__()
+        super().__init__(loc)
         self.name = name
-        self.args = args
-        self.type_name = type_name
-        self.line = loc.line
-        self.kind = ExprKind.PrototypeKind
+        self.args = tuple(args)
+        self.type_name = sys.intern(type_name)
 
     def get_name(self) -> str:
         """Return the prototype name."""
@@ -255,18 +334,25 @@ class PrototypeAST(ExprAST):
 class ReturnStmtAST(ExprAST):
     """AST class for function `return` statement."""
 
+    __slots__ = ("value",)
+    kind: ClassVar[int] = ExprKind.ReturnKind
+    visit_method_name: ClassVar[str] = "visit_return_stmt"
+
     value: ExprAST
 
     def __init__(self, value: ExprAST) -> None:
         """Initialize the ReturnStmtAST instance."""
         super().__init__()
         self.value = value
-        self.kind = ExprKind.ReturnKind
 
 
 class FunctionAST(ExprAST):
     """AST class for function definition."""
 
+    __slots__ = ("body", "proto")
+    kind: ClassVar[int] = ExprKind.FunctionKind
+    visit_method_name: ClassVar[str] = "visit_function"
+
     proto: PrototypeAST
     body: BlockAST
 
@@ -275,4 +361,57 @@ class FunctionAST(ExprAST):
         super().__init__()
         self.proto = proto
         self.body = body
-        self.kind = ExprKind.FunctionKind
+
+
+# attributes holding the child nodes of each AST class, in source order
+MAP_CHILD_ATTRS: Dict[Type[ExprAST], Tuple[str, ...]] = {
+    BlockAST: ("nodes",),
+    ModuleAST: ("nodes",),
+    UnaryExprAST: ("operand",),
+    BinaryExprAST: ("lhs", "rhs"),
+    CallExprAST: ("args",),
+    IfStmtAST: ("cond", "then_", "else_"),
+    ForStmtAST: ("start", "end", "step", "body"),
+    VarExprAST: ("var_names", "body"),
+    PrototypeAST: ("args",),
+    ReturnStmtAST: ("value",),
+    FunctionAST: ("proto", "body"),
+}
+
+
+def walk(root: ExprAST) -> Iterator[ExprAST]:
+    """
+    Iterate over all the nodes of the given tree in pre-order.
+
+    The traversal uses an explicit stack instead of recursion, so it doesn't
+    depend on the Python recursion limit for deep trees.
+
+    Parameters
+    ----------
+    root : ExprAST
+        The root node of the tree.
+
+    Returns
+    -------
+    Iterator[ExprAST]
+        The nodes of the tree, starting with the root.
+    """
+    stack: List[ExprAST] = [root]
+
+    while stack:
+        node = stack.pop()
+        yield node
+
+        children: List[ExprAST] = []
+        for attr in MAP_CHILD_ATTRS.get(type(node), ()):
+            value = getattr(node, attr)
+
+            if isinstance(value, ExprAST):
+                children.append(value)
+                continue
+
+            for item in value:
+                # note: `VarExprAST.var_names` holds (name, initializer)
+                children.append(item[1] if isinstance(item, tuple) else item)
+
+        stack.extend(reversed(children))
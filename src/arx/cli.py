@@ -1,6 +1,7 @@
 """Functions and classes for handling the CLI call."""
 
 import argparse
+import logging
 
 from typing import Any, Optional
 
@@ -109,6 +110,10 @@ def app() -> None:
     args_parser = get_args()
     args = args_parser.parse_args()
 
+    # note: the logging is configured only by the command line entry point,
+    #       not when the modules are imported (e.g. by tests or other apps).
+    logging.basicConfig(level=logging.INFO)
+
     if args.version:
         return show_version()
 
@@ -1,24 +1,184 @@
 """Set of classes and functions to emit the AST from a given source code."""
 
-from typing import Any, Dict, List, TypeAlias, Union
+import sys
+
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    TypeAlias,
+    Union,
+    cast,
+)
 
 import yaml
 
 from arx import ast
-from arx.codegen.base import CodeGenBase
+from arx.codegen.base import CodeGenMemoBase
+
+try:
+    # note: the libyaml (C) dumper is used when pyyaml is built with it
+    from yaml import CSafeDumper as _BaseDumper
+except ImportError:  # pragma: no cover
+    from yaml import SafeDumper as _BaseDumper  # type: ignore[assignment]
+
+
+class OutputNode:
+    """
+    Output of a tagged AST node, written as the mapping `{key: value}`.
+
+    It is used instead of a one-entry `dict` per node, which takes several
+    times the memory of a slotted object.
+    """
+
+    __slots__ = ("key", "value")
+
+    key: str
+    value: Any
+
+    def __init__(self, key: str, value: Any) -> None:
+        """Initialize OutputNode."""
+        self.key = key
+        self.value = value
+
+
+OutputValueAST: TypeAlias = Union[
+    str, int, float, List[Any], Dict[str, Any], OutputNode
+]
+# a visit that yields the child nodes and receives their output values
+OutputVisitAST: TypeAlias = Generator[
+    ast.ExprAST, OutputValueAST, OutputValueAST
+]
+
+
+class OutputDumper(_BaseDumper):
+    """YAML dumper that writes repeated (memoized) values in full."""
+
+    def ignore_aliases(self, data: Any) -> bool:
+        """Never replace a repeated value by an alias."""
+        return True
+
+
+def _to_yaml_node(dumper: OutputDumper, value: OutputValueAST) -> yaml.Node:
+    """
+    Build the YAML node graph for the given output value.
+
+    It does the same work as `dumper.represent`, but with an explicit stack
+    instead of recursion, so the depth of the output isn't limited by the
+    Python recursion limit.
+
+    Parameters
+    ----------
+    dumper : OutputDumper
+        The dumper used to represent the scalar values.
+    value : OutputValueAST
+        The output value of a visit.
+
+    Returns
+    -------
+    yaml.Node
+        The root node of the YAML node graph.
+    """
+    root: List[yaml.Node] = []
+    # pending (value, parent node list, key node for a mapping entry)
+    stack: List[Tuple[Any, List[Any], Optional[yaml.Node]]] = [
+        (value, root, None)
+    ]
+
+    while stack:
+        item, parent, key_node = stack.pop()
+        children: List[Tuple[Any, Any]]
+
+        if isinstance(item, OutputNode):
+            node: yaml.Node = yaml.MappingNode(
+                "tag:yaml.org,2002:map", [], flow_style=False
+            )
+            children = [(item.key, item.value)]
+        elif isinstance(item, dict):
+            node = yaml.MappingNode(
+                "tag:yaml.org,2002:map", [], flow_style=False
+            )
+            children = list(item.items())
+        elif isinstance(item, list):
+            node = yaml.SequenceNode(
+                "tag:yaml.org,2002:seq", [], flow_style=False
+            )
+            children = [(None, child) for child in item]
+        else:
+            node = dumper.represent_data(item)
+            children = []
+
+        parent.append(node if key_node is None else (key_node, node))
+
+        # note: the children are pushed in reverse order, so they are
+        #       appended to the node in the original order.
+        for child_key, child in reversed(children):
+            child_key_node = (
+                None if child_key is None else dumper.represent_data(child_key)
+            )
+            stack.append((child, node.value, child_key_node))
+
+    return root[0]
+
+
+class OutputKeys(Dict[Any, str]):
+    """
+    Cache of the output keys of a node tag, e.g. `BINARY[+]`.
+
+    The key for a value is formatted on the first lookup only; the next
+    lookups return the same string object.
+    """
+
+    __slots__ = ("tag",)
+
+    tag: str
 
-OutputValueAST: TypeAlias = Union[str, int, float, List[Any], Dict[str, Any]]
+    def __init__(self, tag: str) -> None:
+        """Initialize OutputKeys."""
+        super().__init__()
+        self.tag = tag
 
+    def __missing__(self, value: Any) -> str:
+        """Format and store the key for the given value."""
+        key = self[value] = f"{self.tag}[{value}]"
+        return key
 
-class ASTtoOutput(CodeGenBase):
+
+class ASTtoOutput(CodeGenMemoBase):
     """Show the AST for the given source code."""
 
-    result_stack: List[OutputValueAST]
+    __slots__ = (
+        "_binary_keys",
+        "_call_keys",
+        "_float_keys",
+        "_function_keys",
+        "_prototype_keys",
+        "_unary_keys",
+        "_variable_keys",
+    )
+
+    _binary_keys: OutputKeys
+    _call_keys: OutputKeys
+    _float_keys: OutputKeys
+    _function_keys: OutputKeys
+    _prototype_keys: OutputKeys
+    _unary_keys: OutputKeys
+    _variable_keys: OutputKeys
 
     def __init__(self) -> None:
-        self.result_stack: List[OutputValueAST] = []
-
-    def visit_binary_expr(self, expr: ast.BinaryExprAST) -> None:
+        super().__init__()
+        self._binary_keys = OutputKeys("BINARY")
+        self._call_keys = OutputKeys("CALL")
+        self._float_keys = OutputKeys("FLOAT")
+        self._function_keys = OutputKeys("FUNCTION")
+        self._prototype_keys = OutputKeys("PROTOTYPE")
+        self._unary_keys = OutputKeys("UNARY")
+        self._variable_keys = OutputKeys("VARIABLE")
+
+    def visit_binary_expr(self, expr: ast.BinaryExprAST) -> OutputVisitAST:
         """
         Visit a ast.BinaryExprAST node.
 
@@ -26,16 +186,11 @@ class ASTtoOutput(CodeGenBase):
         ----------
             expr: The ast.BinaryExprAST node to visit.
         """
-        self.visit(expr.lhs)
-        lhs = self.result_stack.pop()
-
-        self.visit(expr.rhs)
-        rhs = self.result_stack.pop()
-
-        node = {f"BINARY[{expr.op}]": {"lhs": lhs, "rhs": rhs}}
-        self.result_stack.append(node)
+        lhs = yield expr.lhs
+        rhs = yield expr.rhs
+        return OutputNode(self._binary_keys[expr.op], {"lhs": lhs, "rhs": rhs})
 
-    def visit_block(self, expr: ast.BlockAST) -> None:
+    def visit_block(self, expr: ast.BlockAST) -> OutputVisitAST:
         """
         Visit method for tree ast.
 
@@ -46,12 +201,11 @@ class ASTtoOutput(CodeGenBase):
         block_node = []
 
         for node in expr.nodes:
-            self.visit(node)
-            block_node.append(self.result_stack.pop())
+            block_node.append((yield node))
 
-        self.result_stack.append(block_node)
+        return block_node
 
-    def visit_call_expr(self, expr: ast.CallExprAST) -> None:
+    def visit_call_expr(self, expr: ast.CallExprAST) -> OutputVisitAST:
         """
         Visit a ast.CallExprAST node.
 
@@ -62,13 +216,11 @@ class ASTtoOutput(CodeGenBase):
         call_args = []
 
         for node in expr.args:
-            self.visit(node)
-            call_args.append(self.result_stack.pop())
+            call_args.append((yield node))
 
-        call_node = {f"CALL[{expr.callee}]": {"args": call_args}}
-        self.result_stack.append(call_node)
+        return OutputNode(self._call_keys[expr.callee], {"args": call_args})
 
-    def visit_float_expr(self, expr: ast.FloatExprAST) -> None:
+    def visit_float_expr(self, expr: ast.FloatExprAST) -> OutputValueAST:
         """
         Visit a ast.FloatExprAST node.
 
@@ -76,9 +228,16 @@ class ASTtoOutput(CodeGenBase):
         ----------
             expr: The ast.FloatExprAST node to visit.
         """
-        self.result_stack.append(f"FLOAT[{expr.value}]")
+        value = expr.value
 
-    def visit_if_stmt(self, expr: ast.IfStmtAST) -> None:
+        if value == 0.0:
+            # note: 0.0 and -0.0 are the same dict key, but not the same key
+            #       in the output.
+            return f"FLOAT[{value}]"
+
+        return self._float_keys[value]
+
+    def visit_if_stmt(self, expr: ast.IfStmtAST) -> OutputVisitAST:
         """
         Visit an ast.IfStmtAST node.
 
@@ -86,31 +245,21 @@ class ASTtoOutput(CodeGenBase):
         ----------
             expr: The ast.IfStmtAST node to visit.
         """
-        self.visit(expr.cond)
-        if_condition = self.result_stack.pop()
+        if_condition = yield expr.cond
+        if_then = yield expr.then_
+        if_else = (yield expr.else_) if expr.else_ else []
 
-        self.visit(expr.then_)
-        if_then = self.result_stack.pop()
-
-        if expr.else_:
-            self.visit(expr.else_)
-            if_else = self.result_stack.pop()
-        else:
-            if_else = []
-
-        node = {
-            "IF-STMT": {
-                "CONDITION": if_condition,
-                "THEN": if_then,
-            }
+        if_node: Dict[str, Any] = {
+            "CONDITION": if_condition,
+            "THEN": if_then,
         }
 
         if if_else:
-            node["IF-STMT"]["ELSE"] = if_else
+            if_node["ELSE"] = if_else
 
-        self.result_stack.append(node)
+        return OutputNode("IF-STMT", if_node)
 
-    def visit_for_stmt(self, expr: ast.ForStmtAST) -> None:
+    def visit_for_stmt(self, expr: ast.ForStmtAST) -> OutputVisitAST:
         """
         Visit a ast.ForStmtAST node.
 
@@ -118,29 +267,22 @@ class ASTtoOutput(CodeGenBase):
         ----------
             expr: The ast.ForStmtAST node to visit.
         """
-        self.visit(expr.start)
-        for_start = self.result_stack.pop()
-
-        self.visit(expr.end)
-        for_end = self.result_stack.pop()
-
-        self.visit(expr.step)
-        for_step = self.result_stack.pop()
-
-        self.visit(expr.body)
-        for_body = self.result_stack.pop()
-
-        node = {
-            "FOR-STMT": {
+        for_start = yield expr.start
+        for_end = yield expr.end
+        for_step = yield expr.step
+        for_body = yield expr.body
+
+        return OutputNode(
+            "FOR-STMT",
+            {
                 "start": for_start,
                 "end": for_end,
                 "step": for_step,
                 "body": for_body,
-            }
-        }
-        self.result_stack.append(node)
+            },
+        )
 
-    def visit_function(self, expr: ast.FunctionAST) -> None:
+    def visit_function(self, expr: ast.FunctionAST) -> OutputVisitAST:
         """
         Visit a ast.FunctionAST node.
 
@@ -148,23 +290,17 @@ class ASTtoOutput(CodeGenBase):
         ----------
             expr: The ast.FunctionAST node to visit.
         """
-        fn_args = []
-        for node in expr.proto.args:
-            self.visit(node)
-            fn_args.append(self.result_stack.pop())
-
-        self.visit(expr.body)
-        fn_body = self.result_stack.pop()
-
-        fn = {}
-        fn[f"FUNCTION[{expr.proto.name}]"] = {
-            "args": fn_args,
-            "body": fn_body,
-        }
+        # note: the args are visited via the prototype, so they are cached
+        #       together with it.
+        fn_proto = cast(OutputNode, (yield expr.proto))
+        fn_body = yield expr.body
 
-        self.result_stack.append(fn)
+        return OutputNode(
+            self._function_keys[expr.proto.name],
+            {"args": fn_proto.value, "body": fn_body},
+        )
 
-    def visit_module(self, expr: ast.ModuleAST) -> None:
+    def visit_module(self, expr: ast.ModuleAST) -> OutputVisitAST:
         """
         Visit method for tree ast.
 
@@ -175,24 +311,28 @@ class ASTtoOutput(CodeGenBase):
         block_node = []
 
         for node in expr.nodes:
-            self.visit(node)
-            block_node.append(self.result_stack.pop())
-
-        module_node = {f"MODULE[{expr.name}]": block_node}
+            block_node.append((yield node))
 
-        self.result_stack.append(module_node)
+        return OutputNode(f"MODULE[{expr.name}]", block_node)
 
-    def visit_prototype(self, expr: ast.PrototypeAST) -> None:
+    def visit_prototype(self, expr: ast.PrototypeAST) -> OutputVisitAST:
         """
         Visit a ast.PrototypeAST node.
 
+        The list of the arguments is also used by `visit_function`.
+
         Parameters
         ----------
             expr: The ast.PrototypeAST node to visit.
         """
-        raise Exception("Visitor method not necessary")
+        proto_args = []
+
+        for node in expr.args:
+            proto_args.append((yield node))
+
+        return OutputNode(self._prototype_keys[expr.name], proto_args)
 
-    def visit_return_stmt(self, expr: ast.ReturnStmtAST) -> None:
+    def visit_return_stmt(self, expr: ast.ReturnStmtAST) -> OutputVisitAST:
         """
         Visit a ast.ReturnStmtAST node.
 
@@ -200,11 +340,9 @@ class ASTtoOutput(CodeGenBase):
         ----------
             expr: The ast.ReturnStmtAST node to visit.
         """
-        self.visit(expr.value)
-        node = {"RETURN": self.result_stack.pop()}
-        self.result_stack.append(node)
+        return OutputNode("RETURN", (yield expr.value))
 
-    def visit_unary_expr(self, expr: ast.UnaryExprAST) -> None:
+    def visit_unary_expr(self, expr: ast.UnaryExprAST) -> OutputVisitAST:
         """
         Visit a ast.UnaryExprAST node.
 
@@ -212,11 +350,10 @@ class ASTtoOutput(CodeGenBase):
         ----------
             expr: The ast.UnaryExprAST node to visit.
         """
-        self.visit(expr.operand)
-        node = {f"UNARY[{expr.op_code}]": self.result_stack.pop()}
-        self.result_stack.append(node)
+        operand = yield expr.operand
+        return OutputNode(self._unary_keys[expr.op_code], operand)
 
-    def visit_var_expr(self, expr: ast.VarExprAST) -> None:
+    def visit_var_expr(self, expr: ast.VarExprAST) -> OutputValueAST:
         """
         Visit a ast.VarExprAST node.
 
@@ -226,7 +363,7 @@ class ASTtoOutput(CodeGenBase):
         """
         raise Exception("Variable declaration will be changed soon.")
 
-    def visit_variable_expr(self, expr: ast.VariableExprAST) -> None:
+    def visit_variable_expr(self, expr: ast.VariableExprAST) -> OutputValueAST:
         """
         Visit a ast.VariableExprAST node.
 
@@ -234,11 +371,25 @@ class ASTtoOutput(CodeGenBase):
         ----------
             expr: The ast.VariableExprAST node to visit.
         """
-        self.result_stack.append(f"VARIABLE[{expr.name, expr.type_name}]")
+        return self._variable_keys[expr.name, expr.type_name]
 
     def emit_ast(self, tree_ast: ast.BlockAST) -> None:
-        """Print the AST for the given source code."""
-        self.visit_block(tree_ast)
+        """
+        Print the AST for the given source code.
 
-        ast_output = {"ROOT": self.result_stack.pop()}
-        print(yaml.dump(ast_output, sort_keys=False))
+        The root is written as the list of its nodes, for any `BlockAST`
+        (e.g. a `ModuleAST` is not written as a `MODULE[...]` entry).
+        """
+        self.clean_memo()
+        ast_output = {"ROOT": [self.visit(node) for node in tree_ast.nodes]}
+        self.clean_memo()
+
+        dumper = OutputDumper(sys.stdout, sort_keys=False)
+        try:
+            dumper.open()
+            dumper.serialize(_to_yaml_node(dumper, ast_output))
+            dumper.close()
+        finally:
+            dumper.dispose()
+        # note: keep the blank line at the end of the output
+        sys.stdout.write("\n")
@@ -1,6 +1,7 @@
 """Base module for code generation."""
 
-from typing import Any, Callable, Dict, Type
+from types import GeneratorType
+from typing import Any, Callable, Dict, Generator, List, Tuple, Type
 
 import llvmlite.binding as llvm
 
@@ -9,87 +10,180 @@ from llvmlite import ir
 from arx import ast
 from arx.exceptions import CodeGenException
 
+MAP_VISIT_METHOD_NAME: Dict[Type[ast.ExprAST], str] = {
+    expr_type: expr_type.visit_method_name
+    for expr_type in (
+        ast.BinaryExprAST,
+        ast.BlockAST,
+        ast.CallExprAST,
+        ast.FloatExprAST,
+        ast.ForStmtAST,
+        ast.FunctionAST,
+        ast.IfStmtAST,
+        ast.ModuleAST,
+        ast.PrototypeAST,
+        ast.ReturnStmtAST,
+        ast.UnaryExprAST,
+        ast.VarExprAST,
+        ast.VariableExprAST,
+    )
+}
+
+
+def _visit_not_implemented(self: Any, expr: ast.ExprAST) -> None:
+    """Fallback for the visit methods that a visitor doesn't implement."""
+    raise CodeGenException(
+        f"Not implemented yet: {type(self).__name__} for "
+        f"{type(expr).__name__}."
+    )
+
 
 class CodeGenBase:
-    """A base Visitor pattern class."""
-
-    def visit(self, expr: ast.ExprAST) -> None:
-        """Call the correspondent visit function for the given expr type."""
-        map_visit_expr: Dict[Type[ast.ExprAST], Callable[[Any], None]] = {
-            ast.BinaryExprAST: self.visit_binary_expr,
-            ast.BlockAST: self.visit_block,
-            ast.CallExprAST: self.visit_call_expr,
-            ast.FloatExprAST: self.visit_float_expr,
-            ast.ForStmtAST: self.visit_for_stmt,
-            ast.FunctionAST: self.visit_function,
-            ast.IfStmtAST: self.visit_if_stmt,
-            ast.ModuleAST: self.visit_module,
-            ast.PrototypeAST: self.visit_prototype,
-            ast.ReturnStmtAST: self.visit_return_stmt,
-            ast.UnaryExprAST: self.visit_unary_expr,
-            ast.VarExprAST: self.visit_var_expr,
-            ast.VariableExprAST: self.visit_variable_expr,
+    """
+    A base Visitor pattern class.
+
+    Subclasses implement the `visit_*` methods listed in
+    `MAP_VISIT_METHOD_NAME`; any of them not implemented falls back to a
+    single shared function that raises `CodeGenException`.
+    """
+
+    __slots__ = ("_visit_methods",)
+
+    _visit_methods: Dict[Type[ast.ExprAST], Callable[[Any], Any]]
+
+    def __init__(self) -> None:
+        """Initialize CodeGenBase."""
+        # note: the visit methods are bound once here, so `visit` doesn't
+        #       need to resolve and bind a method for every node.
+        self._visit_methods = {
+            expr_type: getattr(self, method_name)
+            for expr_type, method_name in MAP_VISIT_METHOD_NAME.items()
         }
 
-        fn = map_visit_expr.get(type(expr))
+    def visit(self, expr: ast.ExprAST) -> Any:
+        """
+        Call the correspondent visit function for the given expr type.
+
+        Returns
+        -------
+            The value returned by the visit method.
+        """
+        fn = self._visit_methods.get(type(expr))
+
+        if fn is None:
+            # note: a node type without an entry (e.g. a subclass of a known
+            #       node) is resolved once by its `visit_method_name`.
+            if not expr.visit_method_name:
+                raise CodeGenException(
+                    f"Fail to downcasting ExprAST: {type(expr).__name__}."
+                )
+            fn = getattr(self, expr.visit_method_name)
+            self._visit_methods[type(expr)] = fn
+
+        return fn(expr)
+
+
+# note: the fallback is set on the base class, so it is inherited by any
+#       visitor, including CodeGenBase itself.
+for _method_name in MAP_VISIT_METHOD_NAME.values():
+    setattr(CodeGenBase, _method_name, _visit_not_implemented)
+
+
+class CodeGenMemoBase(CodeGenBase):
+    """
+    A base Visitor class for side-effect-free passes.
+
+    The value returned by each visit is cached by node identity, so a
+    subtree that is reachable more than once is only visited once. The cache
+    is kept across visits, so `clean_memo` should be called before visiting
+    a new tree.
 
-        if not fn:
-            print("Fail to downcasting ExprAST.")
-            return
+    A visit method can also be a generator: it yields each child node that
+    it needs, receives the value of that child, and returns its own value.
+    These visits are run with an explicit stack instead of recursion, so the
+    depth of the tree isn't limited by the Python recursion limit.
+    """
 
-        fn(expr)
+    __slots__ = ("_memo",)
 
-    def visit_binary_expr(self, expr: ast.BinaryExprAST) -> None:
-        """Visit method for binary expression."""
-        raise CodeGenException("Not implemented yet.")
+    # note: the node is kept in the entry, so its id can't be reused by a
+    #       new object while the entry is cached.
+    _memo: Dict[int, Tuple[ast.ExprAST, Any]]
 
-    def visit_block(self, expr: ast.BlockAST) -> None:
-        """Visit method for tree ast."""
-        raise CodeGenException("Not implemented yet.")
+    def __init__(self) -> None:
+        """Initialize CodeGenMemoBase."""
+        super().__init__()
+        self._memo = {}
 
-    def visit_call_expr(self, expr: ast.CallExprAST) -> None:
-        """Visit method for function call."""
-        raise CodeGenException("Not implemented yet.")
+    def clean_memo(self) -> None:
+        """Drop all the cached visit results."""
+        self._memo = {}
 
-    def visit_float_expr(self, expr: ast.FloatExprAST) -> None:
-        """Visit method for float."""
-        raise CodeGenException("Not implemented yet.")
+    def _start_visit(self, expr: ast.ExprAST) -> Any:
+        """Return the cached value of expr, or start its visit."""
+        cached = self._memo.get(id(expr))
 
-    def visit_for_stmt(self, expr: ast.ForStmtAST) -> None:
-        """Visit method for `for` loop."""
-        raise CodeGenException("Not implemented yet.")
+        if cached is not None:
+            return cached[1]
 
-    def visit_if_stmt(self, expr: ast.IfStmtAST) -> None:
-        """Visit method for if statement."""
-        raise CodeGenException("Not implemented yet.")
+        result = CodeGenBase.visit(self, expr)
 
-    def visit_function(self, expr: ast.FunctionAST) -> None:
-        """Visit method for function definition."""
-        raise CodeGenException("Not implemented yet.")
+        if type(result) is not GeneratorType:
+            self._memo[id(expr)] = (expr, result)
 
-    def visit_module(self, expr: ast.ModuleAST) -> None:
-        """Visit method for module."""
-        raise CodeGenException("Not implemented yet.")
+        return result
 
-    def visit_prototype(self, expr: ast.PrototypeAST) -> None:
-        """Visit method for prototype."""
-        raise CodeGenException("Not implemented yet.")
+    def visit(self, expr: ast.ExprAST) -> Any:
+        """Visit the given expr, reusing the cached result if available."""
+        result = self._start_visit(expr)
 
-    def visit_return_stmt(self, expr: ast.ReturnStmtAST) -> None:
-        """Visit method for expression."""
-        raise CodeGenException("Not implemented yet.")
+        if type(result) is not GeneratorType:
+            return result
 
-    def visit_unary_expr(self, expr: ast.UnaryExprAST) -> None:
-        """Visit method for unary expression."""
-        raise CodeGenException("Not implemented yet.")
+        # pending (node, visit) pairs, the innermost one on top
+        stack: List[Tuple[ast.ExprAST, Generator[Any, Any, Any]]] = [
+            (expr, result)
+        ]
+        value = None
 
-    def visit_var_expr(self, expr: ast.VarExprAST) -> None:
-        """Visit method for variable declaration."""
-        raise CodeGenException("Not implemented yet.")
+        while stack:
+            node, node_visit = stack[-1]
 
-    def visit_variable_expr(self, expr: ast.VariableExprAST) -> None:
-        """Visit method for variable usage."""
-        raise CodeGenException("Not implemented yet.")
+            try:
+                child = node_visit.send(value)
+            except StopIteration as stop:
+                stack.pop()
+                value = stop.value
+                self._memo[id(node)] = (node, value)
+                continue
+
+            value = self._start_visit(child)
+
+            if type(value) is GeneratorType:
+                stack.append((child, value))
+                value = None
+
+        return value
+
+
+_LLVM_INITIALIZED = False
+
+
+def _initialize_llvm() -> None:
+    """Initialize the LLVM target registry etc. once per process."""
+    global _LLVM_INITIALIZED
+
+    if _LLVM_INITIALIZED:
+        return
+
+    llvm.initialize()
+    llvm.initialize_all_asmprinters()
+    llvm.initialize_all_targets()
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmparser()
+    llvm.initialize_native_asmprinter()
+
+    _LLVM_INITIALIZED = True
 
 
 class VariablesLLVM:
@@ -101,6 +195,13 @@ class VariablesLLVM:
     INT32_TYPE: ir.types.Type
     VOID_TYPE: ir.types.Type
 
+    # constants shared by the generated code (e.g. conditions and steps)
+    FLOAT_ZERO: ir.Constant
+    FLOAT_ONE: ir.Constant
+
+    # type name -> LLVM type, filled by `CodeGenLLVMBase.initialize`
+    data_types: Dict[str, ir.types.Type]
+
     context: ir.context.Context
     module: ir.module.Module
 
@@ -118,18 +219,10 @@ class VariablesLLVM:
         -------
             ir.Type: The LLVM data type.
         """
-        if type_name == "float":
-            return self.FLOAT_TYPE
-        elif type_name == "double":
-            return self.DOUBLE_TYPE
-        elif type_name == "int8":
-            return self.INT8_TYPE
-        elif type_name == "int32":
-            return self.INT32_TYPE
-        elif type_name == "char":
-            return self.INT8_TYPE
-        elif type_name == "void":
-            return self.VOID_TYPE
+        data_type = self.data_types.get(type_name)
+
+        if data_type is not None:
+            return data_type
 
         raise CodeGenException("[EE] CodeGen(LLVM): type_name not valid.")
 
@@ -137,8 +230,10 @@ class VariablesLLVM:
 class CodeGenLLVMBase(CodeGenBase):
     """ArxLLVM gathers all the main global variables for LLVM workflow."""
 
+    __slots__ = ("_llvm", "named_values")
+
     # AllocaInst
-    named_values: Dict[str, Any] = {}  # noqa: RUF012
+    named_values: Dict[str, Any]
     _llvm: VariablesLLVM
 
     def initialize(self) -> None:
@@ -146,14 +241,9 @@ class CodeGenLLVMBase(CodeGenBase):
         # self._llvm.context = ir.context.Context()
         self._llvm = VariablesLLVM()
         self._llvm.module = ir.module.Module("Arx")
+        self.named_values = {}
 
-        # initialize the target registry etc.
-        llvm.initialize()
-        llvm.initialize_all_asmprinters()
-        llvm.initialize_all_targets()
-        llvm.initialize_native_target()
-        llvm.initialize_native_asmparser()
-        llvm.initialize_native_asmprinter()
+        _initialize_llvm()
 
         # Create a new builder for the module.
         self._llvm.ir_builder = ir.IRBuilder()
@@ -165,6 +255,18 @@ class CodeGenLLVMBase(CodeGenBase):
         self._llvm.INT32_TYPE = ir.IntType(32)
         self._llvm.VOID_TYPE = ir.VoidType()
 
+        self._llvm.FLOAT_ZERO = ir.Constant(self._llvm.FLOAT_TYPE, 0.0)
+        self._llvm.FLOAT_ONE = ir.Constant(self._llvm.FLOAT_TYPE, 1.0)
+
+        self._llvm.data_types = {
+            "float": self._llvm.FLOAT_TYPE,
+            "double": self._llvm.DOUBLE_TYPE,
+            "int8": self._llvm.INT8_TYPE,
+            "int32": self._llvm.INT32_TYPE,
+            "char": self._llvm.INT8_TYPE,
+            "void": self._llvm.VOID_TYPE,
+        }
+
     def evaluate(self, tree: ast.BlockAST) -> None:
         """Evaluate the given AST object."""
         raise CodeGenException(f"Not an evaluation for {tree} implement yet.")
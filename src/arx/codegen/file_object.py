@@ -1,9 +1,21 @@
 """File Object, Executable or LLVM IR generation."""
 
+import contextlib
+import functools
+import hashlib
 import logging
+import math
+import operator
 import os
+import shutil
+import struct
+import subprocess
+import tempfile
 
-from typing import Any, Dict, List, Union
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import llvmlite
 
 from llvmlite import binding as llvm
 from llvmlite import ir
@@ -14,7 +26,6 @@ from arx.io import ArxFile, ArxIO
 from arx.lexer import Lexer
 from arx.parser import Parser
 
-logging.basicConfig(level=logging.INFO)
 LOG = logging.getLogger(__name__)
 
 
@@ -22,16 +33,173 @@ INPUT_FILE: str = ""
 OUTPUT_FILE: str = ""
 ARX_VERSION: str = ""
 IS_BUILD_LIB: bool = True
+# optimization level of the pass pipeline used by `ObjectGenerator`
+OPT_LEVEL: int = 2
+# inlining threshold of the pass pipeline (the `-O2` default of clang)
+INLINING_THRESHOLD: int = 225
+# version of the object code cache, it should be increased when the pass
+# pipeline (or anything else that changes the object code for the same IR)
+# changes, so the objects cached before are not reused
+OBJECT_CACHE_VERSION: int = 1
+# max number of object codes kept in memory by `ObjectGenerator.evaluate`
+OBJECT_CACHE_MAX_SIZE: int = 32
+# directory of the object codes cached on disk by `ObjectGenerator.evaluate`
+# (if None, it is given by `ARX_CACHE` or defaults to `~/.cache/arx`)
+# note: the files are never removed by arx, the directory can be deleted
+#       at any time to free its space
+OBJECT_CACHE_PATH: Optional[Path] = None
+
+
+# source of the placeholder `main` linked into the executables
+# note: it just has a purpose to demonstrate an initial implementation
+#       it will be improved in a follow-up PR
+MAIN_CPP_SOURCE: str = (
+    "#include <iostream>\n"
+    "int main() {\n"
+    '  std::cout << "ARX[WARNING]: '
+    'This is an empty executable file" << std::endl;\n'
+    "}\n"
+)
+
+# arithmetic binary operators -> (unbound IRBuilder method, result name)
+MAP_BINARY_OP_TO_ARITH: Dict[str, Tuple[Callable[..., ir.Value], str]] = {
+    "+": (ir.IRBuilder.fadd, "addtmp"),
+    "-": (ir.IRBuilder.fsub, "subtmp"),
+    "*": (ir.IRBuilder.fmul, "multmp"),
+}
+
+# comparison binary operators -> result name of the comparison
+MAP_BINARY_OP_TO_CMP: Dict[str, str] = {
+    "<": "lttmp",
+    ">": "gttmp",
+}
+
+# binary operators folded when both operands are constants
+MAP_BINARY_OP_TO_FOLD: Dict[str, Callable[[float, float], Any]] = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "<": operator.lt,
+    ">": operator.gt,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _find_linker() -> Optional[str]:
+    """Return the path of the linker, searched in PATH once per process."""
+    return shutil.which("clang++")
+
+
+@functools.lru_cache(maxsize=None)
+def _get_compiler_version(compiler_path: str) -> str:
+    """Return the `--version` output of the given compiler, once per path."""
+    try:
+        return subprocess.run(  # nosec
+            [compiler_path, "--version"], capture_output=True, text=True
+        ).stdout
+    except OSError:
+        return ""
+
+
+def _get_object_cache_path() -> Optional[Path]:
+    """
+    Return the directory of the object code cache.
+
+    It is resolved on each call, so the `ARX_CACHE` environment variable is
+    read when the cache is used, not when the module is imported.
+
+    Returns
+    -------
+    Optional[Path]
+        The cache directory, or None if the cache is disabled because no
+        directory could be determined (e.g. there is no home directory).
+    """
+    if OBJECT_CACHE_PATH is not None:
+        return OBJECT_CACHE_PATH
+
+    try:
+        cache_path = os.environ.get("ARX_CACHE")
+
+        if cache_path:
+            return Path(cache_path).expanduser()
+
+        return Path.home() / ".cache" / "arx"
+    except RuntimeError:
+        # note: raised by `Path.home` and `expanduser` without a home
+        LOG.debug("Object code cache is disabled.")
+        return None
+
+
+def _to_float32(value: float) -> float:
+    """Round the given value to the nearest single precision float."""
+    return float(struct.unpack("f", struct.pack("f", value))[0])
+
+
+def _fold_binary_op(op: str, lhs: float, rhs: float) -> Optional[float]:
+    """
+    Compute the given binary operation on two single precision constants.
+
+    Parameters
+    ----------
+    op : str
+        The binary operator.
+    lhs : float
+        The value of the left operand.
+    rhs : float
+        The value of the right operand.
+
+    Returns
+    -------
+    Optional[float]
+        The result with the same semantics of the emitted instruction, or
+        None if the operation can't be folded.
+    """
+    fold_op = MAP_BINARY_OP_TO_FOLD.get(op)
+
+    if fold_op is None:
+        return None
+
+    # note: the operands are rounded as the float constants in the IR.
+    #       +, - and * in double precision and then rounded to single
+    #       precision give the same result of the single precision ones
+    #       (including the overflow to infinity).
+    lhs = _to_float32(lhs)
+    rhs = _to_float32(rhs)
+
+    if op not in MAP_BINARY_OP_TO_CMP:
+        return _to_float32(fold_op(lhs, rhs))
+
+    # note: the comparisons are unordered, so they are true for NaN
+    if math.isnan(lhs) or math.isnan(rhs):
+        return 1.0
+
+    return 1.0 if fold_op(lhs, rhs) else 0.0
 
 
 class ObjectGenerator(CodeGenLLVMBase):
     """Generate object files or executable from an AST."""
 
-    function_protos: Dict[str, ast.PrototypeAST]
-    output_file: str = ""
-    input_file: str = ""
-    is_lib: bool = True
-    result_stack: List[Union[ir.Value, ir.Function]] = []  # noqa: RUF012
+    __slots__ = (
+        "_entry_builder",
+        "_function_types",
+        "_object_cache",
+        "_object_cache_header",
+        "input_file",
+        "is_lib",
+        "output_file",
+        "pass_manager",
+        "pass_manager_builder",
+        "target",
+        "target_machine",
+    )
+
+    output_file: str
+    input_file: str
+    is_lib: bool
+    _object_cache: Dict[str, bytes]
+    _object_cache_header: bytes
+    _function_types: Dict[int, ir.FunctionType]
+    _entry_builder: Optional[ir.IRBuilder]
 
     def __init__(
         self,
@@ -39,23 +207,49 @@ class ObjectGenerator(CodeGenLLVMBase):
         output_file: str = "tmp.o",
         is_lib: bool = True,
     ):
+        super().__init__()
+
         self.input_file = input_file
         self.output_file = output_file or f"{input_file}.o"
         self.is_lib = is_lib
 
-        self.function_protos: Dict[str, ast.PrototypeAST] = {}
-        self.module = ir.Module()
-
-        self.result_stack: List[Union[ir.Value, ir.Function]] = []
+        self._object_cache: Dict[str, bytes] = {}
+        self._function_types: Dict[int, ir.FunctionType] = {}
+        # builder for the allocas in the entry block of the current function
+        self._entry_builder: Optional[ir.IRBuilder] = None
 
         super().initialize()
 
-        logging.info("target_triple")
+        LOG.debug("target_triple")
         self.target = llvm.Target.from_default_triple()
         self.target_machine = self.target.create_target_machine(
             codemodel="small"
         )
 
+        # note: the optimization pipeline is built once and reused by every
+        #       `evaluate` call.
+        pass_manager_builder = llvm.create_pass_manager_builder()
+        pass_manager_builder.opt_level = OPT_LEVEL
+        pass_manager_builder.inlining_threshold = INLINING_THRESHOLD
+        pass_manager_builder.loop_vectorize = True
+        pass_manager_builder.slp_vectorize = True
+        self.pass_manager_builder = pass_manager_builder
+        self.pass_manager = llvm.create_module_pass_manager()
+        pass_manager_builder.populate(self.pass_manager)
+
+        # note: everything, besides the IR, that changes the emitted object
+        #       code is part of the cache key
+        llvm_version = ".".join(map(str, llvm.llvm_version_info))
+        self._object_cache_header = (
+            f"arx-object-cache:{OBJECT_CACHE_VERSION}\n"
+            f"llvmlite:{llvmlite.__version__}:llvm:{llvm_version}\n"
+            f"triple:{self.target_machine.triple}\n"
+            f"opt:{OPT_LEVEL}:inline:{INLINING_THRESHOLD}"
+            f":loop-vectorize:{pass_manager_builder.loop_vectorize}"
+            f":slp-vectorize:{pass_manager_builder.slp_vectorize}"
+            ":function-passes\n"
+        ).encode()
+
         self._add_builtins()
 
     def _add_builtins(self) -> None:
@@ -75,6 +269,7 @@ class ObjectGenerator(CodeGenLLVMBase):
         putchard_ty = ir.FunctionType(
             self._llvm.FLOAT_TYPE, [self._llvm.FLOAT_TYPE]
         )
+        self._function_types[1] = putchard_ty
         putchard = ir.Function(self._llvm.module, putchard_ty, "putchard")
 
         ir_builder = ir.IRBuilder(putchard.append_basic_block("entry"))
@@ -84,7 +279,7 @@ class ObjectGenerator(CodeGenLLVMBase):
         )
 
         ir_builder.call(putchar, [ival])
-        ir_builder.ret(ir.Constant(self._llvm.FLOAT_TYPE, 0))
+        ir_builder.ret(self._llvm.FLOAT_ZERO)
 
     def evaluate(
         self, block_ast: ast.BlockAST, show_llvm_ir: bool = False
@@ -100,15 +295,43 @@ class ObjectGenerator(CodeGenLLVMBase):
         -------
             int: The compilation result.
         """
-        logging.info("Starting main_loop")
+        LOG.debug("Starting main_loop")
         self.emit_object(block_ast)
 
-        # Convert LLVM IR into in-memory representation
-        if show_llvm_ir:
-            return print(str(self._llvm.module))
+        llvm_ir = str(self._llvm.module)
 
-        result_mod = llvm.parse_assembly(str(self._llvm.module))
-        result_object = self.target_machine.emit_object(result_mod)
+        if show_llvm_ir:
+            return print(llvm_ir)
+
+        # note: the same IR (e.g. a repeated line in the shell, or an
+        #       unchanged program) reuses the object code emitted before,
+        #       from memory or from the cache directory, instead of
+        #       compiling it again.
+        ir_hash = hashlib.blake2b(digest_size=16)
+        ir_hash.update(self._object_cache_header)
+        ir_hash.update(llvm_ir.encode())
+        ir_key = ir_hash.hexdigest()
+
+        result_object = self._object_cache.get(ir_key)
+
+        if result_object is None:
+            result_object = self._read_cached_object(ir_key)
+
+        if result_object is None:
+            # Convert LLVM IR into in-memory representation
+            result_mod = llvm.parse_assembly(llvm_ir)
+            # note: the textual IR is not needed anymore, release it before
+            #       the optimization and the code emission allocate.
+            del llvm_ir
+            self._optimize(result_mod)
+            result_object = self.target_machine.emit_object(result_mod)
+            self._write_cached_object(ir_key, result_object)
+
+        if ir_key not in self._object_cache:
+            if len(self._object_cache) >= OBJECT_CACHE_MAX_SIZE:
+                # drop the oldest entry
+                del self._object_cache[next(iter(self._object_cache))]
+            self._object_cache[ir_key] = result_object
 
         if self.output_file == "":
             self.output_file = self.input_file + ".o"
@@ -121,42 +344,99 @@ class ObjectGenerator(CodeGenLLVMBase):
         if not self.is_lib:
             self.compile_executable()
 
+    def _optimize(self, result_mod: llvm.ModuleRef) -> None:
+        """
+        Run the optimization passes on the given module.
+
+        The function passes (e.g. the promotion of the allocas to registers)
+        run first on each defined function, then the module passes (e.g.
+        inlining) run on the whole module.
+        """
+        # note: a function pass manager is bound to a module, so it is
+        #       created for each module.
+        function_pass_manager = llvm.create_function_pass_manager(result_mod)
+        self.pass_manager_builder.populate(function_pass_manager)
+
+        function_pass_manager.initialize()
+        for fn in result_mod.functions:
+            if not fn.is_declaration:
+                function_pass_manager.run(fn)
+        function_pass_manager.finalize()
+
+        self.pass_manager.run(result_mod)
+
+    def _read_cached_object(self, ir_key: str) -> Optional[bytes]:
+        """Return the object code cached on disk for the given key."""
+        cache_path = _get_object_cache_path()
+
+        if cache_path is None:
+            return None
+
+        try:
+            return (cache_path / f"{ir_key}.o").read_bytes()
+        except OSError:
+            return None
+
+    def _write_cached_object(self, ir_key: str, result_object: bytes) -> None:
+        """Store the object code on disk for the given key, if possible."""
+        # note: the object code is written to a temporary file first and
+        #       then renamed, so a concurrent reader never sees a partial
+        #       object file.
+        cache_path = _get_object_cache_path()
+
+        if cache_path is None:
+            return
+
+        tmp_path = cache_path / f"{ir_key}.{os.getpid()}.tmp"
+
+        try:
+            cache_path.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(result_object)
+            os.replace(tmp_path, cache_path / f"{ir_key}.o")
+        except OSError:
+            LOG.debug("Object code cache is not writable.")
+            # note: e.g. the cache path is not a directory
+            with contextlib.suppress(OSError):
+                tmp_path.unlink(missing_ok=True)
+
     def compile_executable(self) -> None:
         """Compile into an executable file."""
         print("Not fully implemented yet.")
         # generate an executable file
 
-        linker_path = "clang++"
+        linker_path = _find_linker()
+
+        if linker_path is None:
+            raise Exception("ARX[FAIL]: clang++ was not found in PATH.")
+
         executable_path = self.input_file + "c"
-        # note: it just has a purpose to demonstrate an initial implementation
-        #       it will be improved in a follow-up PR
-        content = (
-            "#include <iostream>\n"
-            "int main() {\n"
-            '  std::cout << "ARX[WARNING]: '
-            'This is an empty executable file" << std::endl;\n'
-            "}\n"
-        )
 
-        main_cpp_path = ArxFile.create_tmp_file(content)
+        main_object_path = self._get_cached_main_object(linker_path)
+        is_tmp_main_object = main_object_path is None
 
-        if main_cpp_path == "":
-            raise Exception("ARX[FAIL]: Executable file was not created.")
+        if main_object_path is None:
+            # note: without a usable cache, the object file is compiled
+            #       into a temporary file for this executable only.
+            tmp_fd, tmp_name = tempfile.mkstemp(suffix=".o")
+            os.close(tmp_fd)
+            main_object_path = Path(tmp_name)
+
+            if not self._compile_main_object(linker_path, main_object_path):
+                main_object_path.unlink(missing_ok=True)
+                raise Exception("ARX[FAIL]: Executable file was not created.")
 
         # Example (running it from a shell prompt):
         # clang++ \
         #   ${CLANG_EXTRAS} \
         #   ${DEBUG_FLAGS} \
         #   -fPIC \
-        #   -std=c++20 \
-        #   "${TEST_DIR_PATH}/integration/${test_name}.cpp" \
+        #   "${TMP_DIR}/main.o" \
         #   ${OBJECT_FILE} \
         #   -o "${TMP_DIR}/main"
 
         compiler_args = [
             "-fPIC",
-            "-std=c++20",
-            main_cpp_path,
+            str(main_object_path),
             self.output_file,
             "-o",
             executable_path,
@@ -165,18 +445,111 @@ class ObjectGenerator(CodeGenLLVMBase):
         # Add any additional compiler flags or include paths as needed
         # compiler_args.append("-I/path/to/include")
 
-        linker_path = "clang++"
-        compiler_cmd = linker_path + " " + " ".join(compiler_args)
+        compiler_cmd = [linker_path, *compiler_args]
 
-        print("ARX[INFO]: ", compiler_cmd)
-        compile_result = os.system(compiler_cmd)  # nosec
+        print("ARX[INFO]: ", " ".join(compiler_cmd))
+        # note: the arguments are passed as a list, without a shell
+        compile_result = subprocess.run(compiler_cmd).returncode  # nosec
 
-        ArxFile.delete_file(main_cpp_path)
+        if is_tmp_main_object:
+            main_object_path.unlink(missing_ok=True)
 
         if compile_result != 0:
             llvm.errs() << "failed to compile and link object file"
             exit(1)
 
+    def _compile_main_object(
+        self, linker_path: str, object_path: Path
+    ) -> bool:
+        """
+        Compile the placeholder `main` source into the given object file.
+
+        Parameters
+        ----------
+        linker_path : str
+            The path of the C++ compiler used to compile the source.
+        object_path : Path
+            The path of the object file to be created.
+
+        Returns
+        -------
+        bool
+            True if the object file was compiled, False otherwise.
+        """
+        main_cpp_path = ArxFile.create_tmp_file(MAIN_CPP_SOURCE)
+
+        if main_cpp_path == "":
+            return False
+
+        compiler_cmd = [
+            linker_path,
+            "-fPIC",
+            "-std=c++20",
+            "-c",
+            main_cpp_path,
+            "-o",
+            str(object_path),
+        ]
+
+        print("ARX[INFO]: ", " ".join(compiler_cmd))
+        compile_result = subprocess.run(compiler_cmd).returncode  # nosec
+
+        ArxFile.delete_file(main_cpp_path)
+
+        return compile_result == 0
+
+    def _get_cached_main_object(self, linker_path: str) -> Optional[Path]:
+        """
+        Return the path of the placeholder `main` object file in the cache.
+
+        The `main` source is compiled once for each compiler and the object
+        file is kept in the object cache directory, so the next executables
+        are only linked.
+
+        Parameters
+        ----------
+        linker_path : str
+            The path of the C++ compiler used to compile the source.
+
+        Returns
+        -------
+        Optional[Path]
+            The path of the object file, or None if the cache can't be used.
+        """
+        cache_path = _get_object_cache_path()
+
+        if cache_path is None:
+            return None
+
+        # note: the object file depends on the source and on the compiler
+        main_hash = hashlib.blake2b(digest_size=8)
+        main_hash.update(MAIN_CPP_SOURCE.encode())
+        main_hash.update(f"\n{os.path.realpath(linker_path)}\n".encode())
+        main_hash.update(_get_compiler_version(linker_path).encode())
+        main_key = main_hash.hexdigest()
+
+        main_object_path = cache_path / f"main-{main_key}.o"
+
+        if main_object_path.is_file():
+            return main_object_path
+
+        # note: compiled to a temporary file first and then renamed, as the
+        #       object files in the cache.
+        tmp_path = cache_path / f"main-{main_key}.{os.getpid()}.tmp"
+
+        try:
+            cache_path.mkdir(parents=True, exist_ok=True)
+
+            if self._compile_main_object(linker_path, tmp_path):
+                os.replace(tmp_path, main_object_path)
+                return main_object_path
+        except OSError:
+            LOG.debug("Object code cache is not writable.")
+
+        with contextlib.suppress(OSError):
+            tmp_path.unlink(missing_ok=True)
+        return None
+
     def open_interactive(self) -> None:
         """
         Open the Arx shell.
@@ -199,22 +572,21 @@ class ObjectGenerator(CodeGenLLVMBase):
             except KeyboardInterrupt:
                 break
 
-    def get_function(self, name: str) -> ir.Function:
+    def get_function(self, name: str) -> Optional[ir.Function]:
         """
-        Put the function defined by the given name to result_func.
+        Return the function defined by the given name.
 
         Parameters
         ----------
             name: Function name
-        """
-        if name in self._llvm.module.globals:
-            fn = self._llvm.module.get_global(name)
-            self.result_stack.append(fn)
-            return
 
-        if name in self.function_protos:
-            self.visit(self.function_protos[name])
-            return
+        Returns
+        -------
+            The llvm function, or None if it is not defined.
+        """
+        # note: every prototype is added to the module when it is visited,
+        #       so the module globals are the only table of functions.
+        return self._llvm.module.globals.get(name)
 
     def create_entry_block_alloca(
         self, var_name: str, type_name: str
@@ -234,11 +606,18 @@ class ObjectGenerator(CodeGenLLVMBase):
         -------
           An llvm allocation instance.
         """
-        tmp_builder = ir.IRBuilder()
-        tmp_builder.position_at_start(
-            self._llvm.ir_builder.function.entry_basic_block
-        )
-        return tmp_builder.alloca(
+        fn = self._llvm.ir_builder.function
+        entry_builder = self._entry_builder
+
+        # note: the builder is created once per function and reused for
+        #       all its variables, the new allocas are inserted after the
+        #       previous ones, at the start of the entry block.
+        if entry_builder is None or entry_builder.function is not fn:
+            entry_builder = ir.IRBuilder()
+            entry_builder.position_at_start(fn.entry_basic_block)
+            self._entry_builder = entry_builder
+
+        return entry_builder.alloca(
             self._llvm.get_data_type(type_name), None, var_name
         )
 
@@ -254,7 +633,7 @@ class ObjectGenerator(CodeGenLLVMBase):
         """
         self.visit_block(tree)
 
-    def visit_float_expr(self, expr: ast.FloatExprAST) -> None:
+    def visit_float_expr(self, expr: ast.FloatExprAST) -> ir.Value:
         """
         Code generation for ast.FloatExprAST.
 
@@ -263,9 +642,9 @@ class ObjectGenerator(CodeGenLLVMBase):
             expr: The ast.FloatExprAST instance
         """
         result = ir.Constant(self._llvm.FLOAT_TYPE, expr.value)
-        self.result_stack.append(result)
+        return result
 
-    def visit_variable_expr(self, expr: ast.VariableExprAST) -> None:
+    def visit_variable_expr(self, expr: ast.VariableExprAST) -> ir.Value:
         """
         Code generation for ast.VariableExprAST.
 
@@ -280,9 +659,9 @@ class ObjectGenerator(CodeGenLLVMBase):
             raise Exception(msg)
 
         result = self._llvm.ir_builder.load(expr_var, expr.name)
-        self.result_stack.append(result)
+        return result
 
-    def visit_unary_expr(self, expr: ast.UnaryExprAST) -> None:
+    def visit_unary_expr(self, expr: ast.UnaryExprAST) -> ir.Value:
         """
         Code generation for ast.UnaryExprAST.
 
@@ -290,8 +669,7 @@ class ObjectGenerator(CodeGenLLVMBase):
         ----------
             expr: The ast.UnaryExprAST instance
         """
-        self.visit(expr.operand)
-        operand_value = self.result_stack.pop()
+        operand_value = self.visit(expr.operand)
         if not operand_value:
             raise Exception("ObjectGen: Empty unary operand.")
 
@@ -300,9 +678,9 @@ class ObjectGenerator(CodeGenLLVMBase):
             raise Exception("Unknown unary operator")
 
         result = self._llvm.ir_builder.call(fn, [operand_value], "unop")
-        self.result_stack.append(result)
+        return result
 
-    def visit_binary_expr(self, expr: ast.BinaryExprAST) -> None:
+    def visit_binary_expr(self, expr: ast.BinaryExprAST) -> ir.Value:
         """
         Code generation for ast.BinaryExprAST.
 
@@ -310,6 +688,9 @@ class ObjectGenerator(CodeGenLLVMBase):
         ----------
             expr: The ast.BinaryExprAST instance
         """
+        ir_builder = self._llvm.ir_builder
+        float_type = self._llvm.FLOAT_TYPE
+
         if expr.op == "=":
             # Special case '=' because we don't want to emit the lhs as an
             # expression.
@@ -324,79 +705,71 @@ class ObjectGenerator(CodeGenLLVMBase):
                 raise Exception("destination of '=' must be a variable")
 
             # Codegen the rhs.
-            self.visit(expr.rhs)
-            llvm_rhs = self.result_stack.pop()
+            llvm_rhs = self.visit(expr.rhs)
 
             if not llvm_rhs:
                 raise Exception("codegen: Invalid rhs expression.")
 
             # Look up the name.
-            llvm_lhs = self.named_values[var_lhs.get_name()]
+            llvm_lhs = self.named_values.get(var_lhs.get_name())
 
             if not llvm_lhs:
                 raise Exception("codegen: Invalid lhs variable name")
 
-            self._llvm.ir_builder.store(llvm_rhs, llvm_lhs)
-            result = llvm_rhs
-            self.result_stack.append(result)
-            return
+            ir_builder.store(llvm_rhs, llvm_lhs)
+            return llvm_rhs
 
-        self.visit(expr.lhs)
-        llvm_lhs = self.result_stack.pop()
-        self.visit(expr.rhs)
-        llvm_rhs = self.result_stack.pop()
+        llvm_lhs = self.visit(expr.lhs)
+        llvm_rhs = self.visit(expr.rhs)
 
         if not llvm_lhs or not llvm_rhs:
             raise Exception("codegen: Invalid lhs/rhs")
 
-        if expr.op == "+":
-            result = self._llvm.ir_builder.fadd(llvm_lhs, llvm_rhs, "addtmp")
-            self.result_stack.append(result)
-            return
-        elif expr.op == "-":
-            result = self._llvm.ir_builder.fsub(llvm_lhs, llvm_rhs, "subtmp")
-            self.result_stack.append(result)
-            return
-        elif expr.op == "*":
-            result = self._llvm.ir_builder.fmul(llvm_lhs, llvm_rhs, "multmp")
-            self.result_stack.append(result)
-            return
-        elif expr.op == "<":
-            cmp_result = self._llvm.ir_builder.fcmp_unordered(
-                "<", llvm_lhs, llvm_rhs, "lttmp"
-            )
-            # Convert bool 0/1 to float 0.0 or 1.0
-            result = self._llvm.ir_builder.uitofp(
-                cmp_result, self._llvm.FLOAT_TYPE, "booltmp"
-            )
-            self.result_stack.append(result)
-            return
-        elif expr.op == ">":
-            cmp_result = self._llvm.ir_builder.fcmp_unordered(
-                ">", llvm_lhs, llvm_rhs, "gttmp"
+        op = expr.op
+
+        if isinstance(llvm_lhs, ir.Constant) and isinstance(
+            llvm_rhs, ir.Constant
+        ):
+            folded = _fold_binary_op(op, llvm_lhs.constant, llvm_rhs.constant)
+            if folded is not None:
+                return ir.Constant(float_type, folded)
+
+        arith_op = MAP_BINARY_OP_TO_ARITH.get(op)
+
+        if arith_op is not None:
+            builder_method, result_name = arith_op
+            return builder_method(ir_builder, llvm_lhs, llvm_rhs, result_name)
+
+        cmp_name = MAP_BINARY_OP_TO_CMP.get(op)
+
+        if cmp_name is not None:
+            cmp_result = ir_builder.fcmp_unordered(
+                op, llvm_lhs, llvm_rhs, cmp_name
             )
             # Convert bool 0/1 to float 0.0 or 1.0
-            result = self._llvm.ir_builder.uitofp(
-                cmp_result, self._llvm.FLOAT_TYPE, "booltmp"
-            )
-            self.result_stack.append(result)
-            return
+            return ir_builder.uitofp(cmp_result, float_type, "booltmp")
 
         # If it wasn't a builtin binary operator, it must be a user defined
         # one. Emit a call to it.
-        fn = self.get_function("binary" + expr.op)
-        result = self._llvm.ir_builder.call(fn, [llvm_lhs, llvm_rhs], "binop")
-        self.result_stack.append(result)
+        fn = self.get_function("binary" + op)
+        result = ir_builder.call(fn, [llvm_lhs, llvm_rhs], "binop")
+        return result
 
-    def visit_block(self, expr: ast.BlockAST) -> None:
+    def visit_block(self, expr: ast.BlockAST) -> List[ir.Value]:
         """Visit method for BlockAST."""
+        # note: the visit methods are called directly from the dispatch
+        #       table, `visit` is only used to resolve unknown node types.
+        visit_methods = self._visit_methods
+        visit = self.visit
         result = []
+
         for node in expr.nodes:
-            self.visit(node)
-            result.append(self.result_stack.pop())
-        self.result_stack.append(result)
+            fn = visit_methods.get(type(node))
+            result.append(visit(node) if fn is None else fn(node))
 
-    def visit_call_expr(self, expr: ast.CallExprAST) -> None:
+        return result
+
+    def visit_call_expr(self, expr: ast.CallExprAST) -> ir.Value:
         """
         Code generation for ast.CallExprAST.
 
@@ -404,6 +777,8 @@ class ObjectGenerator(CodeGenLLVMBase):
         ----------
             expr: The ast.CallExprAST instance
         """
+        ir_builder = self._llvm.ir_builder
+
         callee_f = self.get_function(expr.callee)
 
         if not callee_f:
@@ -414,16 +789,15 @@ class ObjectGenerator(CodeGenLLVMBase):
 
         llvm_args = []
         for arg in expr.args:
-            self.visit(arg)
-            llvm_arg = self.result_stack.pop()
+            llvm_arg = self.visit(arg)
             if not llvm_arg:
                 raise Exception("codegen: Invalid callee argument.")
             llvm_args.append(llvm_arg)
 
-        result = self._llvm.ir_builder.call(callee_f, llvm_args, "calltmp")
-        self.result_stack.append(result)
+        result = ir_builder.call(callee_f, llvm_args, "calltmp")
+        return result
 
-    def visit_if_stmt(self, expr: ast.IfStmtAST) -> None:
+    def visit_if_stmt(self, expr: ast.IfStmtAST) -> ir.Value:
         """
         Code generation for ast.IfStmtAST.
 
@@ -431,67 +805,63 @@ class ObjectGenerator(CodeGenLLVMBase):
         ----------
             expr: The ast.IfStmtAST instance
         """
-        self.visit(expr.cond)
-        cond_v = self.result_stack.pop()
+        ir_builder = self._llvm.ir_builder
+        float_type = self._llvm.FLOAT_TYPE
+
+        cond_v = self.visit(expr.cond)
 
         if not cond_v:
             raise Exception("codegen: Invalid condition expression.")
 
         # Convert condition to a bool by comparing non-equal to 0.0.
-        cond_v = self._llvm.ir_builder.fcmp_ordered(
+        cond_v = ir_builder.fcmp_ordered(
             "!=",
             cond_v,
-            ir.Constant(self._llvm.FLOAT_TYPE, 0.0),
+            self._llvm.FLOAT_ZERO,
         )
 
-        # fn = self._llvm.ir_builder.position_at_start().getParent()
+        # Create blocks for the then, else and merge cases, at the end of
+        # the function.
+        fn = ir_builder.function
+        then_bb = fn.append_basic_block("then")
+        else_bb = fn.append_basic_block("else")
+        merge_bb = fn.append_basic_block("ifcont")
 
-        # Create blocks for the then and else cases. Insert the 'then' block
-        # at the end of the function.
-        # then_bb = ir.Block(self._llvm.ir_builder.function, "then", fn)
-        then_bb = self._llvm.ir_builder.function.append_basic_block("then")
-        else_bb = ir.Block(self._llvm.ir_builder.function, "else")
-        merge_bb = ir.Block(self._llvm.ir_builder.function, "ifcont")
-
-        self._llvm.ir_builder.cbranch(cond_v, then_bb, else_bb)
+        ir_builder.cbranch(cond_v, then_bb, else_bb)
 
         # Emit then value.
-        self._llvm.ir_builder.position_at_start(then_bb)
-        self.visit(expr.then_)
-        then_v = self.result_stack.pop()
+        ir_builder.position_at_start(then_bb)
+        then_v = self.visit(expr.then_)
 
         if not then_v:
             raise Exception("codegen: `Then` expression is invalid.")
 
-        self._llvm.ir_builder.branch(merge_bb)
+        ir_builder.branch(merge_bb)
 
         # Codegen of 'then' can change the current block, update then_bb
         # for the PHI.
-        then_bb = self._llvm.ir_builder.block
+        then_bb = ir_builder.block
 
         # Emit else block.
-        self._llvm.ir_builder.function.basic_blocks.append(else_bb)
-        self._llvm.ir_builder.position_at_start(else_bb)
-        self.visit(expr.else_)
-        else_v = self.result_stack.pop()
+        ir_builder.position_at_start(else_bb)
+        else_v = self.visit(expr.else_)
         if not else_v:
             raise Exception("Revisit this!")
 
         # Emission of else_val could have modified the current basic block.
-        else_bb = self._llvm.ir_builder.block
-        self._llvm.ir_builder.branch(merge_bb)
+        else_bb = ir_builder.block
+        ir_builder.branch(merge_bb)
 
         # Emit merge block.
-        self._llvm.ir_builder.function.basic_blocks.append(merge_bb)
-        self._llvm.ir_builder.position_at_start(merge_bb)
-        phi = self._llvm.ir_builder.phi(self._llvm.FLOAT_TYPE, "iftmp")
+        ir_builder.position_at_start(merge_bb)
+        phi = ir_builder.phi(float_type, "iftmp")
 
         phi.add_incoming(then_v, then_bb)
         phi.add_incoming(else_v, else_bb)
 
-        self.result_stack.append(phi)
+        return phi
 
-    def visit_for_stmt(self, expr: ast.ForStmtAST) -> None:
+    def visit_for_stmt(self, expr: ast.ForStmtAST) -> Optional[ir.Value]:
         """
         Code generation for ast.ForStmtAST.
 
@@ -499,29 +869,30 @@ class ObjectGenerator(CodeGenLLVMBase):
         ----------
             expr: The ast.ForStmtAST instance.
         """
-        saved_block = self._llvm.ir_builder.block
+        ir_builder = self._llvm.ir_builder
+
+        saved_block = ir_builder.block
         var_addr = self.create_entry_block_alloca(expr.var_name, "float")
-        self._llvm.ir_builder.position_at_end(saved_block)
+        ir_builder.position_at_end(saved_block)
 
         # Emit the start code first, without 'variable' in scope.
-        self.visit(expr.start)
-        start_val = self.result_stack.pop()
+        start_val = self.visit(expr.start)
         if not start_val:
             raise Exception("codegen: Invalid start argument.")
 
         # Store the value into the alloca.
-        self._llvm.ir_builder.store(start_val, var_addr)
+        ir_builder.store(start_val, var_addr)
 
         # Make the new basic block for the loop header, inserting after
         # current block.
-        loop_bb = self._llvm.ir_builder.function.append_basic_block("loop")
+        loop_bb = ir_builder.function.append_basic_block("loop")
 
         # Insert an explicit fall through from the current block to the
         # loop_bb.
-        self._llvm.ir_builder.branch(loop_bb)
+        ir_builder.branch(loop_bb)
 
         # Start insertion in loop_bb.
-        self._llvm.ir_builder.position_at_start(loop_bb)
+        ir_builder.position_at_start(loop_bb)
 
         # Within the loop, the variable is defined equal to the PHI node.
         # If it shadows an existing variable, we have to restore it, so save
@@ -532,52 +903,47 @@ class ObjectGenerator(CodeGenLLVMBase):
         # Emit the body of the loop. This, like any other expr, can change
         # the current basic_block. Note that we ignore the value computed by
         # the body, but don't allow an error.
-        self.visit(expr.body)
-        body_val = self.result_stack.pop()
+        body_val = self.visit(expr.body)
 
         if not body_val:
-            return
+            return None
 
         # Emit the step value.
         if expr.step:
-            self.visit(expr.step)
-            step_val = self.result_stack.pop()
+            step_val = self.visit(expr.step)
             if not step_val:
-                return
+                return None
         else:
             # If not specified, use 1.0.
-            step_val = ir.Constant(self._llvm.FLOAT_TYPE, 1.0)
+            step_val = self._llvm.FLOAT_ONE
 
         # Compute the end condition.
-        self.visit(expr.end)
-        end_cond = self.result_stack.pop()
+        end_cond = self.visit(expr.end)
         if not end_cond:
-            return
+            return None
 
         # Reload, increment, and restore the var_addr. This handles the case
         # where the body of the loop mutates the variable.
-        cur_var = self._llvm.ir_builder.load(var_addr, expr.var_name)
-        next_var = self._llvm.ir_builder.fadd(cur_var, step_val, "nextvar")
-        self._llvm.ir_builder.store(next_var, var_addr)
+        cur_var = ir_builder.load(var_addr, expr.var_name)
+        next_var = ir_builder.fadd(cur_var, step_val, "nextvar")
+        ir_builder.store(next_var, var_addr)
 
         # Convert condition to a bool by comparing non-equal to 0.0.
-        end_cond = self._llvm.ir_builder.fcmp_ordered(
+        end_cond = ir_builder.fcmp_ordered(
             "!=",
             end_cond,
-            ir.Constant(self._llvm.DOUBLE_TYPE, 0.0),
+            self._llvm.FLOAT_ZERO,
             "loopcond",
         )
 
         # Create the "after loop" block and insert it.
-        after_bb = self._llvm.ir_builder.function.append_basic_block(
-            "afterloop"
-        )
+        after_bb = ir_builder.function.append_basic_block("afterloop")
 
         # Insert the conditional branch into the end of loop_bb.
-        self._llvm.ir_builder.cbranch(end_cond, loop_bb, after_bb)
+        ir_builder.cbranch(end_cond, loop_bb, after_bb)
 
         # Any new code will be inserted in after_bb.
-        self._llvm.ir_builder.position_at_start(after_bb)
+        ir_builder.position_at_start(after_bb)
 
         # Restore the unshadowed variable.
         if old_val:
@@ -586,8 +952,7 @@ class ObjectGenerator(CodeGenLLVMBase):
             self.named_values.pop(expr.var_name, None)
 
         # for expr always returns 0.0.
-        result = ir.Constant(self._llvm.FLOAT_TYPE, 0.0)
-        self.result_stack.append(result)
+        return self._llvm.FLOAT_ZERO
 
     def visit_var_expr(self, expr: ast.VarExprAST) -> None:
         """
@@ -607,60 +972,99 @@ class ObjectGenerator(CodeGenLLVMBase):
         ----------
             expr: The ast.PrototypeAST instance.
         """
-        args_type = [self._llvm.FLOAT_TYPE] * len(expr.args)
-        return_type = self._llvm.get_data_type("float")
-        fn_type = ir.FunctionType(return_type, args_type, False)
-
-        fn = ir.Function(self._llvm.module, fn_type, expr.name)
+        # note: a function already declared (e.g. by an `extern`) is reused
+        #       instead of created again, with the argument names of this
+        #       prototype.
+        fn = self._llvm.module.globals.get(expr.name)
+
+        if fn is not None:
+            if not fn.is_declaration:
+                raise Exception(f"codegen: Redefinition of `{expr.name}`.")
+
+            if len(fn.args) != len(expr.args):
+                raise Exception(
+                    f"codegen: Redefinition of `{expr.name}` "
+                    "with a different number of arguments."
+                )
+        else:
+            fn = self._create_function(expr)
 
         # Set names for all arguments.
-        for idx, arg in enumerate(fn.args):
-            fn.args[idx].name = expr.args[idx].name
+        for llvm_arg, arg in zip(fn.args, expr.args):
+            # note: setting the same name again would make it unique (`x.1`)
+            if llvm_arg.name != arg.name:
+                llvm_arg.name = arg.name
 
         return fn
 
+    def _create_function(self, expr: ast.PrototypeAST) -> ir.Function:
+        """Add a new function for the given prototype to the module."""
+        # note: all the functions are float -> float for now, so the
+        #       function type only depends on the number of arguments.
+        n_args = len(expr.args)
+        fn_type = self._function_types.get(n_args)
+
+        if fn_type is None:
+            args_type = [self._llvm.FLOAT_TYPE] * n_args
+            return_type = self._llvm.get_data_type("float")
+            fn_type = ir.FunctionType(return_type, args_type, False)
+            self._function_types[n_args] = fn_type
+
+        return ir.Function(self._llvm.module, fn_type, expr.name)
+
     def visit_function(self, expr: ast.FunctionAST) -> ir.Function:
         """
         Code generation for FunctionExprAST.
 
-        Transfer ownership of the prototype to the ArxLLVM::function_protos
-        map, but keep a reference to it for use below.
+        The prototype is added to the module, or the function already
+        declared with the same name is reused.
 
         Parameters
         ----------
             expr: The ast.FunctionAST instance.
         """
-        proto = expr.proto
-        self.function_protos[expr.proto.get_name()] = expr.proto
-        fn = self.get_function(proto.get_name())
+        fn = self.visit(expr.proto)
 
         if not fn:
             raise Exception("codegen: Invalid function.")
 
         # Create a new basic block to start insertion into.
         basic_block = fn.append_basic_block("entry")
-        self._llvm.ir_builder = ir.IRBuilder(basic_block)
+        ir_builder = ir.IRBuilder(basic_block)
+        self._llvm.ir_builder = ir_builder
+        self._entry_builder = None
+
+        float_type = self._llvm.FLOAT_TYPE
+        llvm_args = fn.args
+        # note: the names from the prototype, as the names of the LLVM
+        #       arguments can be made unique by llvmlite (e.g. `x.1`).
+        arg_names = [arg.name for arg in expr.proto.args]
+
+        # Create an alloca for each argument first, so all of them are
+        # grouped at the start of the entry block.
+        allocas = [
+            ir_builder.alloca(float_type, name=arg_name)
+            for arg_name in arg_names
+        ]
 
-        for llvm_arg in fn.args:
-            # Create an alloca for this variable.
-            alloca = self._llvm.ir_builder.alloca(
-                self._llvm.FLOAT_TYPE, name=llvm_arg.name
-            )
+        # note: a new symbol table for each function, so the variables of
+        #       the previous function are not visible here.
+        self.named_values = {}
 
+        for llvm_arg, arg_name, alloca in zip(llvm_args, arg_names, allocas):
             # Store the initial value into the alloca.
-            self._llvm.ir_builder.store(llvm_arg, alloca)
+            ir_builder.store(llvm_arg, alloca)
 
             # Add arguments to variable symbol table.
-            self.named_values[llvm_arg.name] = alloca
+            self.named_values[arg_name] = alloca
 
-        self.visit(expr.body)
-        retval = self.result_stack.pop()
+        retval = self.visit(expr.body)
 
         # Validate the generated code, checking for consistency.
         if retval:
-            self._llvm.ir_builder.ret(retval)
+            ir_builder.ret(retval)
         else:
-            self._llvm.ir_builder.ret(ir.Constant(self._llvm.FLOAT_TYPE, 0))
+            ir_builder.ret(self._llvm.FLOAT_ZERO)
         return fn
 
     def visit_return_stmt(self, expr: ast.ReturnStmtAST) -> None:
@@ -3,17 +3,18 @@
 from __future__ import annotations
 
 import copy
+import sys
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, cast
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple, cast
 
 from arx.io import ArxIO
 
 EOF = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class SourceLocation:
     """
     Represents the source location with line and column information.
@@ -30,6 +31,24 @@ class SourceLocation:
     col: int = 0
 
 
+# note: token locations are shared between tokens at the same position, so
+#       they should be treated as read-only. the cache is cleared when it
+#       reaches its size limit.
+_LOC_CACHE: Dict[Tuple[int, int], SourceLocation] = {}
+_LOC_CACHE_MAX_SIZE = 4096
+
+
+def _get_loc(line: int, col: int) -> SourceLocation:
+    """Return the shared `SourceLocation` instance for the given position."""
+    key = (line, col)
+    loc = _LOC_CACHE.get(key)
+    if loc is None:
+        if len(_LOC_CACHE) >= _LOC_CACHE_MAX_SIZE:
+            _LOC_CACHE.clear()
+        loc = _LOC_CACHE[key] = SourceLocation(line, col)
+    return loc
+
+
 class TokenKind(Enum):
     """TokenKind enumeration for known variables returned by the lexer."""
 
@@ -102,11 +121,22 @@ MAP_KW_TOKEN_TO_NAME: Dict[TokenKind, str] = {
     TokenKind.kw_const: "const",
 }
 
+# token kinds that show their value next to the name (e.g. `float(1.0)`)
+DISPLAY_VALUE_TOKEN_KINDS: FrozenSet[TokenKind] = frozenset(
+    {
+        TokenKind.identifier,
+        TokenKind.indent,
+        TokenKind.float_literal,
+    }
+)
+
 
 @dataclass
 class Token:
     """Token class store the kind and the value of the token."""
 
+    __slots__ = ("kind", "location", "value")
+
     kind: TokenKind
     value: Any
     location: SourceLocation
@@ -115,11 +145,15 @@ class Token:
         self,
         kind: TokenKind,
         value: Any,
-        location: SourceLocation = SourceLocation(0, 0),
+        location: Optional[SourceLocation] = None,
     ) -> None:
         self.kind = kind
         self.value = value
-        self.location = copy.deepcopy(location)
+        self.location = (
+            _get_loc(location.line, location.col)
+            if location is not None
+            else _get_loc(0, 0)
+        )
 
     def get_name(self) -> str:
         """
@@ -145,11 +179,7 @@ class Token:
         -------
             str: The string representation of the token value.
         """
-        if self.kind == TokenKind.identifier:
-            return "(" + str(self.value) + ")"
-        if self.kind == TokenKind.indent:
-            return "(" + str(self.value) + ")"
-        elif self.kind == TokenKind.float_literal:
+        if self.kind in DISPLAY_VALUE_TOKEN_KINDS:
             return "(" + str(self.value) + ")"
         return ""
 
@@ -306,6 +336,11 @@ class Lexer:
                 identifier += self.last_char
                 self.last_char = self.advance()
 
+            # note: identifiers end up as names, callees and variable names
+            #       in the AST; interning them dedupes repeated names and
+            #       makes later comparisons an identity check.
+            identifier = sys.intern(identifier)
+
             if identifier in self._keyword_map:
                 return Token(
                     kind=self._keyword_map[identifier],
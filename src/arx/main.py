@@ -1,6 +1,7 @@
 """Arx main module."""
 
 import os
+import sys
 
 from typing import Any, List
 
@@ -67,8 +68,9 @@ class ArxMain:
         for input_file in self.input_files:
             ArxIO.file_to_buffer(input_file)
             tokens = lexer.lex()
-            for token in tokens:
-                print(token)
+            # note: write all the tokens of the file at once instead of one
+            #       `print` call per token.
+            sys.stdout.write("".join(f"{token}\n" for token in tokens))
 
     def show_llvm_ir(self) -> None:
         """Compile into LLVM IR the given input file."""
@@ -1,6 +1,6 @@
 """parser module gather all functions and classes for parsing."""
 
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from arx import ast
 from arx.exceptions import ParserException
@@ -15,8 +15,9 @@ class Parser:
     bin_op_precedence: Dict[str, int] = {}  # noqa: RUF012
     indent_level: int = 0
     tokens: TokenList
+    _primary_parsers: Dict[TokenKind, Callable[[], ast.ExprAST]]
 
-    def __init__(self, tokens: TokenList = TokenList([])) -> None:
+    def __init__(self, tokens: Optional[TokenList] = None) -> None:
         """Instantiate the Parser object."""
         self.bin_op_precedence: Dict[str, int] = {
             "=": 2,
@@ -29,7 +30,19 @@ class Parser:
         self.indent_level: int = 0
         # note: it is useful to assign an initial token list here
         #       mainly for tests
-        self.tokens: TokenList = tokens
+        self.tokens: TokenList = (
+            tokens if tokens is not None else TokenList([])
+        )
+        # jump table used by `parse_primary`, keyed by the token kind
+        self._primary_parsers = {
+            TokenKind.identifier: self.parse_identifier_expr,
+            TokenKind.float_literal: self.parse_float_expr,
+            TokenKind.kw_if: self.parse_if_stmt,
+            TokenKind.kw_for: self.parse_for_stmt,
+            TokenKind.kw_var: self.parse_var_expr,
+            TokenKind.kw_return: self.parse_return_function,
+            TokenKind.indent: self.parse_block,
+        }
 
     def clean(self) -> None:
         """Reset the Parser static variables."""
@@ -119,33 +132,26 @@ class Parser:
         ast.ExprAST
             The parsed primary expression, or None if parsing fails.
         """
-        if self.tokens.cur_tok.kind == TokenKind.identifier:
-            return self.parse_identifier_expr()
-        elif self.tokens.cur_tok.kind == TokenKind.float_literal:
-            return self.parse_float_expr()
-        elif self.tokens.cur_tok == Token(kind=TokenKind.operator, value="("):
-            return self.parse_paren_expr()
-        elif self.tokens.cur_tok.kind == TokenKind.kw_if:
-            return self.parse_if_stmt()
-        elif self.tokens.cur_tok.kind == TokenKind.kw_for:
-            return self.parse_for_stmt()
-        elif self.tokens.cur_tok.kind == TokenKind.kw_var:
-            return self.parse_var_expr()
-        elif self.tokens.cur_tok == Token(kind=TokenKind.operator, value=";"):
-            # ignore top-level semicolons.
-            self.tokens.get_next_token()  # eat `;`
-            return self.parse_primary()
-        elif self.tokens.cur_tok.kind == TokenKind.kw_return:
-            return self.parse_return_function()
-        elif self.tokens.cur_tok.kind == TokenKind.indent:
-            return self.parse_block()
-        else:
-            msg: str = (
-                "Parser: Unknown token when expecting an expression:"
-                f"'{self.tokens.cur_tok.get_name()}'."
-            )
-            self.tokens.get_next_token()  # eat unknown token
-            raise Exception(msg)
+        cur_tok = self.tokens.cur_tok
+        parse_fn = self._primary_parsers.get(cur_tok.kind)
+
+        if parse_fn:
+            return parse_fn()
+
+        if cur_tok.kind == TokenKind.operator:
+            if cur_tok.value == "(":
+                return self.parse_paren_expr()
+            if cur_tok.value == ";":
+                # ignore top-level semicolons.
+                self.tokens.get_next_token()  # eat `;`
+                return self.parse_primary()
+
+        msg: str = (
+            "Parser: Unknown token when expecting an expression:"
+            f"'{cur_tok.get_name()}'."
+        )
+        self.tokens.get_next_token()  # eat unknown token
+        raise Exception(msg)
 
     def parse_block(self) -> ast.BlockAST:
         """Parse a block of nodes."""
@@ -0,0 +1,45 @@
+"""Tests for `arx`.`ast`."""
+
+from arx import ast
+from arx.io import ArxIO
+from arx.lexer import Lexer, SourceLocation
+from arx.parser import Parser
+
+
+def test_walk() -> None:
+    """Test the pre-order traversal of a parsed module."""
+    ArxIO.string_to_buffer("fn add_one(a):\n" "    a + 1\n" "add_one(1)\n")
+    module_ast = Parser().parse(Lexer().lex())
+
+    assert [type(node) for node in ast.walk(module_ast)] == [
+        ast.ModuleAST,
+        ast.FunctionAST,
+        ast.PrototypeAST,
+        ast.VariableExprAST,
+        ast.BlockAST,
+        ast.BinaryExprAST,
+        ast.VariableExprAST,
+        ast.FloatExprAST,
+        ast.CallExprAST,
+        ast.FloatExprAST,
+    ]
+
+
+def test_walk_deep_tree() -> None:
+    """Test the traversal doesn't depend on the recursion limit."""
+    expr: ast.ExprAST = ast.FloatExprAST(0.0)
+    for _ in range(10_000):
+        expr = ast.BinaryExprAST(
+            SourceLocation(0, 0), "+", expr, ast.FloatExprAST(1.0)
+        )
+
+    assert sum(1 for _ in ast.walk(expr)) == 20_001
+
+
+def test_location() -> None:
+    """Test the node location is stored as line and column."""
+    expr = ast.VariableExprAST(SourceLocation(3, 7), "a", "float")
+
+    assert (expr.line, expr.col) == (3, 7)
+    assert expr.loc == SourceLocation(3, 7)
+    assert (ast.FloatExprAST(1.0).line, ast.FloatExprAST(1.0).col) == (0, 0)
@@ -1,21 +1,74 @@
 import pytest
 
-from arx.codegen.ast_output import ASTtoOutput
+from arx import ast
+from arx.codegen.ast_output import ASTtoOutput, OutputKeys, OutputNode
+from arx.exceptions import CodeGenException
 from arx.io import ArxIO
 from arx.lexer import Lexer
 from arx.parser import Parser
 
 
 @pytest.mark.parametrize(
-    "code",
+    "code,expected",
     [
-        "1 + 1",
-        "1 + 2 * (3 - 2)",
-        "if (1 < 2):\n" "    3\n" "else:\n" "    2\n",
-        "fn add_one(a):\n" "    a + 1\n" "add_one(1)\n",
+        (
+            "1 + 1",
+            "ROOT:\n"
+            "- BINARY[+]:\n"
+            "    lhs: FLOAT[1.0]\n"
+            "    rhs: FLOAT[1.0]\n",
+        ),
+        (
+            "1 + 2 * (3 - 2)",
+            "ROOT:\n"
+            "- BINARY[+]:\n"
+            "    lhs: FLOAT[1.0]\n"
+            "    rhs:\n"
+            "      BINARY[*]:\n"
+            "        lhs: FLOAT[2.0]\n"
+            "        rhs:\n"
+            "          BINARY[-]:\n"
+            "            lhs: FLOAT[3.0]\n"
+            "            rhs: FLOAT[2.0]\n",
+        ),
+        (
+            "if (1 < 2):\n" "    3\n" "else:\n" "    2\n",
+            "ROOT:\n"
+            "- IF-STMT:\n"
+            "    CONDITION:\n"
+            "      BINARY[<]:\n"
+            "        lhs: FLOAT[1.0]\n"
+            "        rhs: FLOAT[2.0]\n"
+            "    THEN:\n"
+            "    - FLOAT[3.0]\n"
+            "    ELSE:\n"
+            "    - FLOAT[2.0]\n",
+        ),
+        (
+            "fn add_one(a):\n" "    a + 1\n" "add_one(1)\n",
+            "ROOT:\n"
+            "- FUNCTION[add_one]:\n"
+            "    args:\n"
+            "    - VARIABLE[('a', 'float')]\n"
+            "    body:\n"
+            "    - BINARY[+]:\n"
+            "        lhs: VARIABLE[('a', 'float')]\n"
+            "        rhs: FLOAT[1.0]\n"
+            "- CALL[add_one]:\n"
+            "    args:\n"
+            "    - FLOAT[1.0]\n",
+        ),
+        (
+            "extern putchard(x)\n",
+            "ROOT:\n"
+            "- PROTOTYPE[putchard]:\n"
+            "  - VARIABLE[('x', 'float')]\n",
+        ),
     ],
 )
-def test_ast_to_output(code: str) -> None:
+def test_ast_to_output(
+    code: str, expected: str, capsys: pytest.CaptureFixture[str]
+) -> None:
     lexer = Lexer()
     parser = Parser()
     printer = ASTtoOutput()
@@ -24,3 +77,79 @@ def test_ast_to_output(code: str) -> None:
 
     module_ast = parser.parse(lexer.lex())
     printer.emit_ast(module_ast)
+
+    # note: the nodes of the root module are written directly under ROOT
+    assert capsys.readouterr().out == expected + "\n"
+
+
+def test_ast_to_output_shared_node(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test a node reachable twice is written in full both times."""
+    shared = ast.FloatExprAST(1.0)
+    tree_ast = ast.BlockAST()
+    tree_ast.nodes.extend([shared, shared])
+
+    printer = ASTtoOutput()
+    printer.emit_ast(tree_ast)
+
+    output = capsys.readouterr().out
+    assert output.count("FLOAT[1.0]") == 2
+    assert "&" not in output
+
+
+def test_ast_to_output_unknown_node() -> None:
+    """Test visiting an unknown node type raises instead of printing."""
+    printer = ASTtoOutput()
+
+    with pytest.raises(CodeGenException):
+        printer.visit(ast.ExprAST())
+
+
+def test_ast_to_output_node_subclass(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test a subclass of a known node uses the visit method of its class."""
+
+    class ConstFloatExprAST(ast.FloatExprAST):
+        __slots__ = ()
+
+    tree_ast = ast.BlockAST()
+    tree_ast.nodes.append(ConstFloatExprAST(2.0))
+
+    ASTtoOutput().emit_ast(tree_ast)
+
+    assert "FLOAT[2.0]" in capsys.readouterr().out
+
+
+def test_output_keys() -> None:
+    """Test the output keys are formatted once and then reused."""
+    keys = OutputKeys("BINARY")
+
+    assert keys["+"] == "BINARY[+]"
+    assert keys["+"] is keys["+"]
+    assert len(keys) == 1
+
+
+def test_ast_to_output_deep_tree(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    """Test the visit and the output don't depend on the recursion limit."""
+    expr: ast.ExprAST = ast.FloatExprAST(1.0)
+    for _ in range(10_000):
+        expr = ast.UnaryExprAST("-", expr)
+
+    node = ASTtoOutput().visit(expr)
+
+    for _ in range(10_000):
+        assert isinstance(node, OutputNode)
+        assert node.key == "UNARY[-]"
+        node = node.value
+
+    assert node == "FLOAT[1.0]"
+
+    tree_ast = ast.BlockAST()
+    tree_ast.nodes.append(expr)
+    ASTtoOutput().emit_ast(tree_ast)
+
+    output = capsys.readouterr().out
+    assert output.count("UNARY[-]") == 10_000
+    assert output.rstrip().endswith("FLOAT[1.0]")
@@ -0,0 +1,13 @@
+import pytest
+
+from arx import ast
+from arx.codegen.base import CodeGenBase
+from arx.exceptions import CodeGenException
+
+
+def test_codegen_base_not_implemented() -> None:
+    """Test a visit method that isn't implemented raises CodeGenException."""
+    codegen = CodeGenBase()
+
+    with pytest.raises(CodeGenException, match="Not implemented yet"):
+        codegen.visit(ast.FloatExprAST(1.0))
@@ -1,10 +1,16 @@
+import shutil
+
 from pathlib import Path
 
 import pytest
 
+from llvmlite import ir
+
+from arx import ast
+from arx.codegen import file_object
 from arx.codegen.file_object import ObjectGenerator
 from arx.io import ArxIO
-from arx.lexer import Lexer, TokenList
+from arx.lexer import Lexer, SourceLocation, TokenList
 from arx.parser import Parser
 
 PROJECT_PATH = Path(__file__).parent.parent.resolve()
@@ -30,8 +36,118 @@ def test_object_generation(code: str) -> None:
     tokens = TokenList([])
 
     ArxIO.string_to_buffer(code)
-    ast = parser.parse(tokens)
+    tree_ast = parser.parse(tokens)
     objgen = ObjectGenerator()
-    objgen.evaluate(ast)
+    objgen.evaluate(tree_ast)
     # remove temporary object file generated
     (PROJECT_PATH / "tmp.o").unlink()
+
+
+def test_object_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the object code is stored and read back from the disk cache."""
+    monkeypatch.setattr(file_object, "OBJECT_CACHE_PATH", tmp_path / "cache")
+    objgen = ObjectGenerator(output_file=str(tmp_path / "tmp.o"))
+
+    assert objgen._read_cached_object("key") is None
+
+    objgen._write_cached_object("key", b"object")
+    assert objgen._read_cached_object("key") == b"object"
+    # no temporary file is left in the cache directory
+    assert [path.name for path in (tmp_path / "cache").iterdir()] == [
+        "key.o"
+    ]
+
+    # a cache path that is not a directory is ignored
+    monkeypatch.setattr(file_object, "OBJECT_CACHE_PATH", tmp_path / "tmp.o")
+    (tmp_path / "tmp.o").write_bytes(b"")
+    objgen._write_cached_object("key", b"object")
+    assert objgen._read_cached_object("key") is None
+
+
+def test_object_cache_path(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the cache directory is resolved when it is used."""
+    monkeypatch.setenv("ARX_CACHE", str(tmp_path / "arx"))
+    assert file_object._get_object_cache_path() == tmp_path / "arx"
+
+    def home_not_found() -> Path:
+        raise RuntimeError("Could not determine home directory.")
+
+    # without a home directory the cache is disabled
+    monkeypatch.delenv("ARX_CACHE")
+    monkeypatch.setattr(Path, "home", home_not_found)
+    assert file_object._get_object_cache_path() is None
+
+    objgen = ObjectGenerator(output_file=str(tmp_path / "tmp.o"))
+    objgen._write_cached_object("key", b"object")
+    assert objgen._read_cached_object("key") is None
+
+
+@pytest.mark.parametrize(
+    "op,expected",
+    [("+", 3.0), ("-", -1.0), ("*", 2.0), ("<", 1.0), (">", 0.0)],
+)
+def test_constant_folding(op: str, expected: float) -> None:
+    """Test binary operations on constants are folded to a constant."""
+    objgen = ObjectGenerator()
+    fn_type = ir.FunctionType(objgen._llvm.FLOAT_TYPE, [])
+    fn = ir.Function(objgen._llvm.module, fn_type, "main")
+    objgen._llvm.ir_builder = ir.IRBuilder(fn.append_basic_block("entry"))
+
+    loc = SourceLocation(0, 0)
+    expr = ast.BinaryExprAST(
+        loc, op, ast.FloatExprAST(1.0), ast.FloatExprAST(2.0)
+    )
+    result = objgen.visit(expr)
+
+    assert isinstance(result, ir.Constant)
+    assert result.constant == expected
+    assert not fn.entry_basic_block.instructions
+
+
+def test_extern_then_definition() -> None:
+    """Test a function declared by `extern` is reused by its definition."""
+    lexer = Lexer()
+    parser = Parser()
+
+    ArxIO.string_to_buffer("extern foo(x)\n" "fn foo(y):\n" "    y + 1\n")
+    module_ast = parser.parse(lexer.lex())
+    extern_ast, function_ast = module_ast.nodes
+
+    objgen = ObjectGenerator()
+    objgen.visit(extern_ast)
+    defined = objgen.visit(function_ast)
+
+    fn = objgen.get_function("foo")
+    assert fn is not None
+    assert fn is defined
+    assert not fn.is_declaration
+    assert [arg.name for arg in fn.args] == ["y"]
+
+    with pytest.raises(Exception, match="Redefinition of `foo`"):
+        objgen.visit(function_ast)
+
+
+@pytest.mark.skipif(
+    shutil.which("c++") is None, reason="a C++ compiler is required"
+)
+def test_compile_executable_without_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test an executable is built when the cache can't be written."""
+    # note: a file where the cache directory should be created
+    (tmp_path / "cache").write_text("")
+    monkeypatch.setattr(file_object, "OBJECT_CACHE_PATH", tmp_path / "cache")
+    monkeypatch.setattr(file_object, "_find_linker", lambda: "c++")
+
+    objgen = ObjectGenerator(
+        input_file=str(tmp_path / "main"),
+        output_file=str(tmp_path / "main.o"),
+        is_lib=False,
+    )
+    objgen.evaluate(ast.BlockAST())
+
+    assert (tmp_path / "mainc").is_file()
@@ -3,7 +3,7 @@
 import pytest
 
 from arx.io import ArxIO
-from arx.lexer import Lexer, Token, TokenKind
+from arx.lexer import Lexer, SourceLocation, Token, TokenKind
 
 
 def test_token_name() -> None:
@@ -101,3 +101,24 @@ def test_get_tok() -> None:
     assert lexer.get_token() == Token(kind=TokenKind.operator, value="(")
     assert lexer.get_token() == Token(kind=TokenKind.float_literal, value=1.0)
     assert lexer.get_token() == Token(kind=TokenKind.operator, value=")")
+
+
+def test_token_location() -> None:
+    """Test the token locations are shared and not tied to the lexer."""
+    # tokens at the same position share the same location object
+    tok_a = Token(TokenKind.identifier, "a", SourceLocation(2, 3))
+    tok_b = Token(TokenKind.identifier, "b", SourceLocation(2, 3))
+    assert tok_a.location is tok_b.location
+    assert tok_a.location == SourceLocation(2, 3)
+
+    ArxIO.string_to_buffer("fn\nmath")
+    lexer = Lexer()
+    tok_fn = lexer.get_token()
+    fn_loc = (tok_fn.location.line, tok_fn.location.col)
+
+    # the lexer location is changed in place while lexing, but the
+    # location of a previous token is not
+    assert tok_fn.location is not lexer.lex_loc
+    tok_math = lexer.get_token()
+    assert (tok_fn.location.line, tok_fn.location.col) == fn_loc
+    assert tok_math.location is not tok_fn.location